@@ -1,18 +1,36 @@
 import sys
 import os
+from functools import lru_cache
 from pathlib import Path
-from diffusers import StableDiffusionPipeline
+from diffusers import StableDiffusionPipeline, DPMSolverMultistepScheduler
 import torch
 import gin
 
 
+@lru_cache(maxsize=1)
+def load_pipeline(model_id, device):
+    """Load a Stable Diffusion pipeline once per (model_id, device) and reuse it across calls."""
+    pipe = StableDiffusionPipeline.from_pretrained(
+        model_id,
+        torch_dtype=torch.float16 if device == "cuda" else torch.float32
+    )
+    pipe = pipe.to(device)
+
+    # DPM-Solver++ matches the default 50-step scheduler in about 20 steps;
+    # attention already runs through PyTorch 2's fused SDPA kernels
+    pipe.scheduler = DPMSolverMultistepScheduler.from_config(pipe.scheduler.config)
+    pipe.enable_vae_slicing()
+    return pipe
+
+
 @gin.configurable
 def generate_image(
     prompt,
     output_dir,
     model_id="runwayml/stable-diffusion-v1-5",
     device="auto",
-    num_inference_steps=50,
+    num_inference_steps=20,
+    guidance_scale=7.0,
 ):
     """
     Generate an image based on a text prompt using the Stable Diffusion model.
@@ -22,6 +40,8 @@ def generate_image(
         output_dir (str): The directory where the generated image will be saved.
         model_id (str, optional): The model ID for the Stable Diffusion model. Defaults to 'CompVis/stable-diffusion-v1-4'.
         device (str, optional): The device to run the model on ('auto', 'cpu', or 'cuda'). Defaults to 'auto'.
+        num_inference_steps (int, optional): Number of DPM-Solver++ denoising steps. Defaults to 20.
+        guidance_scale (float, optional): Classifier-free guidance scale. Defaults to 7.0.
 
     Returns:
         str: The path to the generated image.
@@ -32,11 +52,14 @@ def generate_image(
     # Load Stable Diffusion model
     if device == "auto":
         device = "cuda" if torch.cuda.is_available() else "cpu"
-    pipe = StableDiffusionPipeline.from_pretrained(model_id, torch_dtype=torch.float16)
-    pipe = pipe.to(device)
+    pipe = load_pipeline(model_id, device)
 
     # Generate image
-    image = pipe(prompt).images[0]
+    image = pipe(
+        prompt,
+        num_inference_steps=num_inference_steps,
+        guidance_scale=guidance_scale
+    ).images[0]
 
     # Save the generated image
     image_path = f"{output_dir}/SD_input_image.png"
@@ -18,7 +18,7 @@ def export_scene(output_dir,
     output_dir = Path(output_dir)
     # Gather main assets
     scene['mesh'] = str(output_dir.parent / 'meshes' / 'terrain.obj')
-    scene['tilemap'] = str(output_dir.parent / 'tiles' / 'tilemap.json')
+    scene['tilemap'] = str(output_dir.parent / 'tiles' / 'tilemap.npy')
     scene['tile_legend'] = str(output_dir.parent / 'tiles' / 'tile_legend.json')
     scene['biome_map'] = str(output_dir.parent / 'labels' / 'biome_map.png')
     scene['label_map'] = str(output_dir.parent / 'labels' / 'label_map_superpixel.npy')
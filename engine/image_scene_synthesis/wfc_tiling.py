@@ -20,13 +20,12 @@ def wfc_tiling(biome_map_path, output_dir, pattern_size=3):
     # Define tile legend
     legend = {0: "forest", 1: "river", 2: "cliff", 3: "valley"}
 
-    # Save tilemap and legend
+    # Save tilemap as a binary array and the small legend as JSON
     Path(output_dir).mkdir(parents=True, exist_ok=True)
-    with open(f"{output_dir}/tilemap.json", "w") as f:
-        json.dump({"tilemap": tilemap.tolist()}, f)
+    np.save(f"{output_dir}/tilemap.npy", tilemap)
     with open(f"{output_dir}/tile_legend.json", "w") as f:
         json.dump({"legend": legend}, f)
-    print(f"Saved tilemap.json and tile_legend.json to {output_dir}")
+    print(f"Saved tilemap.npy and tile_legend.json to {output_dir}")
 
 if __name__ == "__main__":
     import sys
@@ -377,7 +377,7 @@ class AssetGenerator:
         
         # Calculate normal map
         width, height = img.size
-        normal_map = np.zeros((height, width, 3))
+        normal_map = np.zeros((height, width, 3), dtype=np.float32)
         
         # Convert to numpy array
         img_array = np.array(img)
@@ -391,9 +391,10 @@ class AssetGenerator:
         normal_map[..., 1] = 1.0
         normal_map[..., 2] = -dy
         
-        # Normalize
-        norm = np.sqrt(np.sum(normal_map * normal_map, axis=2, keepdims=True))
-        normal_map = normal_map / norm
+        # Normalize in place
+        norm = np.einsum('ijk,ijk->ij', normal_map, normal_map)[..., None]
+        np.sqrt(norm, out=norm)
+        np.divide(normal_map, norm, out=normal_map)
         
         # Convert to image
         normal_img = Image.fromarray(
@@ -1,6 +1,7 @@
 import json
 import os
 import argparse
+from functools import lru_cache
 
 class ConfigLoader:
     def __init__(self, config_file='config.json'):
@@ -33,7 +34,7 @@ class ConfigLoader:
         return self.config
 
     @staticmethod
-    def parse_args():
+    def parse_args(argv=None):
         parser = argparse.ArgumentParser(description='Pipeline Configuration')
         parser.add_argument('--prompt_to_image_model_id', type=str, help='Model ID for Stable Diffusion')
         parser.add_argument('--prompt_to_image_device', type=str, help='Device for Stable Diffusion')
@@ -41,7 +42,15 @@ class ConfigLoader:
         parser.add_argument('--structure_extraction_contour_level', type=float, help='Contour level for structure extraction')
         parser.add_argument('--mesh_synthesis_output_format', type=str, help='Output format for mesh synthesis')
         parser.add_argument('--wfc_tiling_pattern_size', type=int, help='Pattern size for WFC tiling')
-        return parser.parse_args()
+        return parser.parse_args(argv)
+
+@lru_cache(maxsize=1)
+def load_config(argv=()):
+    """Build the config once per process: file, then env, then argv overrides"""
+    config_loader = ConfigLoader()
+    config_loader.override_with_env()
+    config_loader.override_with_args(ConfigLoader.parse_args(list(argv)))
+    return config_loader.get_config()
 
 # Usage example
 # config_loader = ConfigLoader()
@@ -4,7 +4,7 @@ from typing import Dict, List, Optional
 
 from .config import SceneGeneratorConfig
 from .layers import SceneGenerator
-from .utils import save_texture, texture_to_data_uri
+from .utils import save_texture, texture_to_data_uri, save_json
 
 
 def setup_logging(level: str = "INFO"):
@@ -108,11 +108,9 @@ def generate_scene(
     export_formats = ["tiled", "web", "unity"]  # Export in multiple formats
     for format_type in export_formats:
         export_data = generator.export_to_json(scene_data, format=format_type)
-    
-    # Save export data
-        with open(output_path / f"scene_{format_type}.json", "w") as f:
-        import json
-        json.dump(export_data, f, indent=2)
+        
+        # Save export data
+        save_json(export_data, output_path / f"scene_{format_type}.json")
     
     return scene_data
 
@@ -31,6 +31,8 @@ class FeatureMatcher:
         self.model = SentenceTransformer(model_name)
         self.templates: Dict[str, FeatureTemplate] = {}
         self.embeddings: Dict[str, torch.Tensor] = {}
+        self._matrix_names: List[str] = []
+        self._matrix: Optional[torch.Tensor] = None
         self._load_default_templates()
     
     def _load_default_templates(self):
@@ -99,12 +101,27 @@ class FeatureMatcher:
         }
         
         for template in default_templates.values():
-            self.add_template(template)
+            self.add_template(template, defer_matrix=True)
+        self._rebuild_matrix()
     
-    def add_template(self, template: FeatureTemplate):
-        """Add a new feature template"""
+    def add_template(self, template: FeatureTemplate, defer_matrix: bool = False):
+        """Add a new feature template
+        
+        Bulk loaders pass ``defer_matrix=True`` and call ``_rebuild_matrix``
+        once afterwards, so loading N templates stacks the matrix once.
+        """
         self.templates[template.name] = template
         self.embeddings[template.name] = self._compute_embedding(template)
+        if not defer_matrix:
+            self._rebuild_matrix()
+    
+    def _rebuild_matrix(self):
+        """Stack all template embeddings into a single (N, D) matrix"""
+        self._matrix_names = list(self.embeddings.keys())
+        if self._matrix_names:
+            self._matrix = torch.stack([self.embeddings[name] for name in self._matrix_names])
+        else:
+            self._matrix = None
     
     def _compute_embedding(self, template: FeatureTemplate) -> torch.Tensor:
         """Compute embedding for a template"""
@@ -118,16 +135,17 @@ class FeatureMatcher:
         max_matches: int = 5
     ) -> List[Tuple[str, float]]:
         """Find matching features for a prompt"""
+        if self._matrix is None:
+            return []
+        
         prompt_embedding = self.model.encode(prompt, convert_to_tensor=True)
         
-        # Calculate similarities
-        similarities = []
-        for name, embedding in self.embeddings.items():
-            similarity = torch.nn.functional.cosine_similarity(
-                prompt_embedding.unsqueeze(0),
-                embedding.unsqueeze(0)
-            ).item()
-            similarities.append((name, similarity))
+        # Calculate similarities against all templates in one call
+        scores = torch.nn.functional.cosine_similarity(
+            prompt_embedding.unsqueeze(0),
+            self._matrix
+        ).tolist()
+        similarities = list(zip(self._matrix_names, scores))
         
         # Sort by similarity and filter by threshold
         matches = [
@@ -184,4 +202,5 @@ class FeatureMatcher:
                 min_distance=template_data['min_distance'],
                 max_density=template_data['max_density']
             )
-            self.add_template(template) 
\ No newline at end of file
+            self.add_template(template, defer_matrix=True)
+        self._rebuild_matrix()
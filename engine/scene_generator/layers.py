@@ -3,27 +3,200 @@ import numpy as np
 import torch
 from PIL import Image
 import logging
+import math
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 from tqdm import tqdm
-from diffusers import StableDiffusionPipeline
+from diffusers import StableDiffusionPipeline, DPMSolverMultistepScheduler
+from numba import njit, prange
+from scipy.ndimage import binary_dilation
 
 from .base import BaseLayer
 from .config import LayerConfig, TerrainConfig, FeatureConfig, PropConfig, VisualConfig, SceneGeneratorConfig
 from .terrain import TerrainGenerator, TerrainType
 from .features import FeatureMatcher, FeatureTemplate
-from .props import PropPlacer, PropType
-from .visual import VisualProcessor, VisualStyle
+from .props import (
+    PropPlacer, PropType, _fit_batch_kernel,
+    _mask_kernel, _mask_kernel_serial, _normalize_threshold, _normalize_threshold_serial
+)
+from .visual import _LEVELS, VisualProcessor, VisualStyle, _style_tone_kernel, _tone_kernel
 from .utils import (
     generate_noise, blend_noise, normalize_array,
     calculate_distance_field, get_environmental_fit,
     save_texture, texture_to_base64, texture_to_data_uri,
-    to_json_serializable
+    pack_array, to_json_serializable
 )
 from .assets import AssetGenerator
 from .models import ModelGenerator
 
 logger = logging.getLogger(__name__)
 
+# Web export material colors
+_FEATURE_COLORS = {
+    'tree': '#2d5a27',
+    'rock': '#808080',
+    'building': '#8b4513',
+    'water': '#0077be',
+    'mountain': '#696969'
+}
+
+_PROP_COLORS = {
+    'bush': '#355e3b',
+    'flower': '#ff69b4',
+    'stone': '#808080',
+    'log': '#8b4513',
+    'mushroom': '#ff4500'
+}
+
+@lru_cache(maxsize=2)
+def _get_sd_pipeline(model_id: str) -> StableDiffusionPipeline:
+    """Load a Stable Diffusion pipeline once and share it across layers"""
+    pipeline = StableDiffusionPipeline.from_pretrained(
+        model_id,
+        torch_dtype=torch.float16
+    )
+    # DPM-Solver++ reaches 50-step PNDM quality in about half the steps
+    pipeline.scheduler = DPMSolverMultistepScheduler.from_config(pipeline.scheduler.config)
+    if torch.cuda.is_available():
+        pipeline = pipeline.to("cuda")
+    pipeline.set_progress_bar_config(disable=True)
+    pipeline.enable_attention_slicing("auto")
+    pipeline.enable_vae_slicing()
+    # Only images larger than the VAE tile are decoded in tiles
+    pipeline.enable_vae_tiling()
+    return pipeline
+
+def _gather_positions(items: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """Collect the (x, y) 'position' of each item into index arrays"""
+    xs = np.fromiter((item['position'][0] for item in items), dtype=np.intp, count=len(items))
+    ys = np.fromiter((item['position'][1] for item in items), dtype=np.intp, count=len(items))
+    return xs, ys
+
+def _scale_xyz(size: Union[float, Tuple[float, ...]]) -> Tuple[float, float, float]:
+    """Expand a scalar or 1-3 element size into (x, y, z) scale, repeating x"""
+    if isinstance(size, tuple):
+        scale_x = float(size[0])
+        scale_y = float(size[1]) if len(size) > 1 else scale_x
+        scale_z = float(size[2]) if len(size) > 2 else scale_x
+        return scale_x, scale_y, scale_z
+    return (float(size),) * 3
+
+@dataclass
+class EntityBatch:
+    """Placed features or props stored as columns rather than per-entity dicts"""
+    types: List[str]
+    xs: np.ndarray      # (N,) grid x
+    ys: np.ndarray      # (N,) grid y
+    scales: np.ndarray  # (N, 3) x/y/z scale
+    
+    @classmethod
+    def from_items(cls, items: List[Dict], size_key: str) -> 'EntityBatch':
+        """Gather types, positions and scales from placement dicts"""
+        xs, ys = _gather_positions(items)
+        scales = np.array([_scale_xyz(item[size_key]) for item in items], dtype=np.float64).reshape(-1, 3)
+        return cls([item['type'] for item in items], xs, ys, scales)
+
+@lru_cache(maxsize=32)
+def _box_struct(ry: int, rx: int) -> np.ndarray:
+    """Read-only (2*ry+1, 2*rx+1) box structuring element"""
+    structure = np.ones((2 * ry + 1, 2 * rx + 1), dtype=bool)
+    structure.flags.writeable = False
+    return structure
+
+def _mark_footprints(
+    occupied: np.ndarray,
+    ys: np.ndarray,
+    xs: np.ndarray,
+    half_sizes: np.ndarray
+):
+    """Mark (2*ry+1, 2*rx+1) boxes centred on (ys, xs) as occupied
+    
+    Footprints are bucketed by (ry, rx) so each distinct size costs one dilation.
+    """
+    if len(ys) == 0:
+        return
+    buckets, inverse = np.unique(half_sizes, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    for b, (ry, rx) in enumerate(buckets):
+        points = np.zeros_like(occupied)
+        points[ys[inverse == b], xs[inverse == b]] = True
+        occupied |= binary_dilation(points, structure=_box_struct(int(ry), int(rx)))
+
+@njit(parallel=True, cache=True)
+def _fit_kernel(
+    elevation: np.ndarray,
+    moisture: np.ndarray,
+    occupancy: np.ndarray,
+    elev_lo: float,
+    elev_hi: float,
+    moist_lo: float,
+    moist_hi: float,
+    out: np.ndarray
+) -> int:
+    """Write environmental fit for free, in-range cells and -inf elsewhere
+    
+    Covers out.shape from the top-left of each input and returns the number
+    of valid cells. Not fastmath, since -inf marks invalid cells.
+    """
+    elev_mean = (elev_lo + elev_hi) / 2
+    moist_mean = (moist_lo + moist_hi) / 2
+    count = 0
+    for i in prange(out.shape[0]):
+        for j in range(out.shape[1]):
+            e = elevation[i, j]
+            m = moisture[i, j]
+            if occupancy[i, j] or e < elev_lo or e > elev_hi or m < moist_lo or m > moist_hi:
+                out[i, j] = -np.inf
+            else:
+                out[i, j] = ((1 - abs(e - elev_mean)) + (1 - abs(m - moist_mean))) / 2
+                count += 1
+    return count
+
+@njit(parallel=True, cache=True)
+def _fuse_layers(elevation: np.ndarray, out: np.ndarray):
+    """Write the water/sand/grass/mountain layers into out[0..3] in one pass"""
+    for i in prange(elevation.shape[0]):
+        for j in range(elevation.shape[1]):
+            e = elevation[i, j]
+            out[0, i, j] = 1.0 if e < 0.2 else 0.0
+            out[1, i, j] = 1.0 - (e - 0.2) * 10 if 0.2 <= e < 0.3 else 0.0
+            out[2, i, j] = 1.0 - abs(e - 0.5) * 2 if 0.3 <= e < 0.7 else 0.0
+            out[3, i, j] = (e - 0.7) * 3.33 if e >= 0.7 else 0.0
+
+@njit(inline='always', cache=True)
+def _gradient_at(elevation: np.ndarray, i: int, j: int):
+    """np.gradient-style (dx, dy) at one cell: central inside, one-sided on edges"""
+    h, w = elevation.shape
+    if j == 0:
+        dx = elevation[i, 1] - elevation[i, 0]
+    elif j == w - 1:
+        dx = elevation[i, j] - elevation[i, j - 1]
+    else:
+        dx = 0.5 * (elevation[i, j + 1] - elevation[i, j - 1])
+    if i == 0:
+        dy = elevation[1, j] - elevation[0, j]
+    elif i == h - 1:
+        dy = elevation[i, j] - elevation[i - 1, j]
+    else:
+        dy = 0.5 * (elevation[i + 1, j] - elevation[i - 1, j])
+    return dx, dy
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _gradient_products(elevation: np.ndarray, normal_out: np.ndarray, slope_out: np.ndarray):
+    """Write unit normals and slope in degrees from a single read of elevation"""
+    for i in prange(elevation.shape[0]):
+        for j in range(elevation.shape[1]):
+            dx, dy = _gradient_at(elevation, i, j)
+            inv_norm = 1.0 / math.sqrt(dx * dx + 1.0 + dy * dy)
+            normal_out[i, j, 0] = -dx * inv_norm
+            normal_out[i, j, 1] = inv_norm
+            normal_out[i, j, 2] = -dy * inv_norm
+            slope_out[i, j] = math.atan(math.sqrt(dx * dx + dy * dy)) * 180.0 / math.pi
+
 class TerrainLayer(BaseLayer):
     def __init__(self, config: TerrainConfig):
         super().__init__(config)
@@ -50,11 +223,8 @@ class TerrainLayer(BaseLayer):
         # Generate height layers for 2.5D
         height_layers = self._generate_height_layers(elevation)
         
-        # Calculate normal map
-        normal_map = self._calculate_normal_map(elevation)
-        
-        # Calculate slope map
-        slope_map = self._calculate_slope_map(elevation)
+        # Calculate normal and slope maps from shared gradients
+        normal_map, slope_map = self._compute_gradient_products(elevation)
         
         # Store debug state if enabled
         if self.config.debug_mode:
@@ -73,56 +243,32 @@ class TerrainLayer(BaseLayer):
         }
     
     def _generate_height_layers(self, elevation: np.ndarray) -> Dict[str, np.ndarray]:
-        """Generate height layers for 2.5D terrain"""
-        layers = {
-            'water': np.zeros_like(elevation),
-            'sand': np.zeros_like(elevation),
-            'grass': np.zeros_like(elevation),
-            'mountain': np.zeros_like(elevation)
-        }
+        """Generate height layers for 2.5D terrain
         
-        # Water layer (below 0.2)
-        layers['water'] = np.where(elevation < 0.2, 1.0, 0.0)
-        
-        # Sand layer (0.2 to 0.3)
-        layers['sand'] = np.where(
-            (elevation >= 0.2) & (elevation < 0.3),
-            1.0 - (elevation - 0.2) * 10,  # Smooth transition
-            0.0
-        )
-        
-        # Grass layer (0.3 to 0.7)
-        layers['grass'] = np.where(
-            (elevation >= 0.3) & (elevation < 0.7),
-            1.0 - abs(elevation - 0.5) * 2,  # Smooth transition
-            0.0
-        )
+        All four layers are computed by a single fused kernel and returned
+        as views into one (4, H, W) buffer.
+        """
+        out = np.empty((4,) + elevation.shape, dtype=elevation.dtype)
+        _fuse_layers(elevation, out)
         
-        # Mountain layer (above 0.7)
-        layers['mountain'] = np.where(
-            elevation >= 0.7,
-            (elevation - 0.7) * 3.33,  # Scale to 0-1
-            0.0
-        )
+        return {
+            'water': out[0],      # Below 0.2
+            'sand': out[1],       # 0.2 to 0.3, smooth transition
+            'grass': out[2],      # 0.3 to 0.7, smooth transition
+            'mountain': out[3]    # Above 0.7, scaled to 0-1
+        }
+    
+    def _compute_gradient_products(self, elevation: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Calculate the normal map and slope map in one fused pass"""
+        normal_map = np.empty(elevation.shape + (3,), dtype=elevation.dtype)
+        slope_map = np.empty_like(elevation)
+        _gradient_products(elevation, normal_map, slope_map)
         
-        return layers
+        return normal_map, slope_map
     
     def _calculate_normal_map(self, elevation: np.ndarray) -> np.ndarray:
         """Calculate normal map for better lighting"""
-        normal_map = np.zeros((elevation.shape[0], elevation.shape[1], 3))
-        
-        # Calculate gradients
-        dx = np.gradient(elevation, axis=1)
-        dy = np.gradient(elevation, axis=0)
-        
-        # Create normal vectors
-        normal_map[..., 0] = -dx
-        normal_map[..., 1] = 1.0
-        normal_map[..., 2] = -dy
-        
-        # Normalize
-        norm = np.sqrt(np.sum(normal_map * normal_map, axis=2, keepdims=True))
-        normal_map = normal_map / norm
+        normal_map, _ = self._compute_gradient_products(elevation)
         
         return normal_map
     
@@ -141,6 +287,7 @@ class FeatureLayer(BaseLayer):
         super().__init__(config)
         self.matcher = FeatureMatcher()
         self.feature_grid = None
+        self._occupancy = None
     
     def generate(
         self,
@@ -156,8 +303,9 @@ class FeatureLayer(BaseLayer):
         ):
             return None
         
-        # Initialize feature grid
+        # Initialize feature grid and the min-distance exclusion mask
         self.feature_grid = np.full(grid_size, -1)
+        self._occupancy = np.zeros(grid_size, dtype=bool)
         features = []
         
         # Find matching features
@@ -206,50 +354,18 @@ class FeatureLayer(BaseLayer):
         similarity: float
     ) -> Optional[Dict]:
         """Place a single feature based on environmental conditions"""
-        # Find valid positions
-        valid_positions = []
-        for y in range(elevation.shape[0]):
-            for x in range(elevation.shape[1]):
-                if self._is_valid_position(x, y, template):
-                    # Calculate environmental fit
-                    fit = get_environmental_fit(
-                        elevation[y, x],
-                        moisture[y, x],
-                        {
-                            'elevation_range': template.elevation_range,
-                            'moisture_range': template.moisture_range
-                        }
-                    )
-                    
-                    # Calculate slope
-                    if x > 0 and x < elevation.shape[1]-1 and y > 0 and y < elevation.shape[0]-1:
-                        dx = abs(elevation[y, x+1] - elevation[y, x-1])
-                        dy = abs(elevation[y+1, x] - elevation[y-1, x])
-                        slope = max(dx, dy) * 100  # Convert to degrees
-                    else:
-                        slope = 0
-                    
-                    # Calculate normal
-                    if x > 0 and x < elevation.shape[1]-1 and y > 0 and y < elevation.shape[0]-1:
-                        dx = elevation[y, x+1] - elevation[y, x-1]
-                        dy = elevation[y+1, x] - elevation[y-1, x]
-                        normal = np.array([-dx, 1.0, -dy])
-                        normal = normal / np.linalg.norm(normal)
-                    else:
-                        normal = np.array([0, 1, 0])
-                    
-                    valid_positions.append((x, y, fit, slope, normal))
-        
-        if not valid_positions:
+        best = self._valid_positions_vec(template, elevation, moisture)
+        if best is None:
             return None
         
-        # Sort by environmental fit and slope
-        valid_positions.sort(key=lambda x: (x[2], -x[3]), reverse=True)
-        
         # Place feature at best position
-        x, y, fit, slope, normal = valid_positions[0]
+        (x, y), fit, slope, normal = best
         self.feature_grid[y, x] = len(self.feature_grid)
         
+        # Reserve the feature's minimum-distance window
+        r = int(template.min_distance)
+        self._occupancy[max(0, y - r):y + r + 1, max(0, x - r):x + r + 1] = True
+        
         # Calculate rotation to align with normal
         rotation = self._calculate_rotation_from_normal(normal)
         
@@ -264,6 +380,66 @@ class FeatureLayer(BaseLayer):
             'rotation': rotation
         }
     
+    def _valid_positions_vec(
+        self,
+        template: FeatureTemplate,
+        elevation: np.ndarray,
+        moisture: np.ndarray
+    ) -> Optional[Tuple[Tuple[int, int], float, float, np.ndarray]]:
+        """Find the best placement cell for a template using whole-array operations
+        
+        Returns ((x, y), fit, slope, normal) for the valid cell with the highest
+        environmental fit, breaking ties by lowest slope, or None if no cell is valid.
+        """
+        # Features can only land where the feature grid and the terrain overlap
+        h = min(self.feature_grid.shape[0], elevation.shape[0])
+        w = min(self.feature_grid.shape[1], elevation.shape[1])
+        
+        # Environmental fit, with out-of-range and occupied cells set to -inf
+        fit = np.empty((h, w))
+        count = _fit_kernel(
+            elevation,
+            moisture,
+            self._occupancy,
+            *template.elevation_range,
+            *template.moisture_range,
+            fit
+        )
+        
+        # Nothing fits, so skip the gradient work entirely
+        if count == 0:
+            return None
+        
+        # Gather candidates as parallel arrays, one per field
+        ys, xs = np.nonzero(np.isfinite(fit))
+        fits = fit[ys, xs]
+        
+        # Central differences, zero on the terrain border
+        height, width = elevation.shape
+        interior = (xs > 0) & (xs < width - 1) & (ys > 0) & (ys < height - 1)
+        dx = elevation[ys, np.minimum(xs + 1, width - 1)] - elevation[ys, np.maximum(xs - 1, 0)]
+        dy = elevation[np.minimum(ys + 1, height - 1), xs] - elevation[np.maximum(ys - 1, 0), xs]
+        dx[~interior] = 0
+        dy[~interior] = 0
+        
+        # Calculate slope
+        slopes = np.maximum(np.abs(dx), np.abs(dy)) * 100  # Convert to degrees
+        
+        # Calculate normal, pointing straight up on the border
+        normals = np.zeros((len(xs), 3), dtype=elevation.dtype)
+        normals[:, 1] = 1.0
+        normals[interior, 0] = -dx[interior]
+        normals[interior, 2] = -dy[interior]
+        norm = np.einsum('ij,ij->i', normals, normals)[:, None]
+        np.sqrt(norm, out=norm)
+        np.divide(normals, norm, out=normals)
+        
+        # Pick the best fit, preferring the flattest cell on ties
+        ties = np.flatnonzero(fits == fits.max())
+        i = ties[np.argmin(slopes[ties])]
+        
+        return (int(xs[i]), int(ys[i])), float(fits[i]), float(slopes[i]), normals[i]
+    
     def _calculate_rotation_from_normal(self, normal: np.ndarray) -> Dict[str, float]:
         """Calculate rotation angles from normal vector"""
         # Convert normal to rotation angles
@@ -276,6 +452,16 @@ class FeatureLayer(BaseLayer):
             'z': 0.0
         }
     
+    def _calculate_rotations_from_normals(self, normals: np.ndarray) -> List[Dict[str, float]]:
+        """Calculate rotation angles for an (N, 3) array of normal vectors"""
+        pitches = np.degrees(np.arctan2(normals[:, 1], np.sqrt(normals[:, 0]**2 + normals[:, 2]**2)))
+        yaws = np.degrees(np.arctan2(normals[:, 0], normals[:, 2]))
+        
+        return [
+            {'x': pitch, 'y': yaw, 'z': 0.0}
+            for pitch, yaw in zip(pitches.tolist(), yaws.tolist())
+        ]
+    
     def _is_valid_position(
         self,
         x: int,
@@ -288,21 +474,8 @@ class FeatureLayer(BaseLayer):
                 0 <= y < self.feature_grid.shape[0]):
             return False
         
-        # Check if position is already occupied
-        if self.feature_grid[y, x] != -1:
-            return False
-        
-        # Check minimum distance from other features
-        min_distance = int(template.min_distance)
-        for dx in range(-min_distance, min_distance + 1):
-            for dy in range(-min_distance, min_distance + 1):
-                nx, ny = x + dx, y + dy
-                if (0 <= nx < self.feature_grid.shape[1] and
-                    0 <= ny < self.feature_grid.shape[0]):
-                    if self.feature_grid[ny, nx] != -1:
-                        return False
-        
-        return True
+        # Check if position is occupied or too close to another feature
+        return not self._occupancy[y, x]
 
 class PropLayer(BaseLayer):
     def __init__(self, config: PropConfig):
@@ -324,21 +497,32 @@ class PropLayer(BaseLayer):
         
         props = []
         occupied = np.zeros_like(terrain_data['elevation'], dtype=bool)
+        rng = np.random.default_rng(seed)
         
         # Mark feature positions as occupied
-        for feature in feature_data['features']:
-            x, y = feature['position']
-            size = feature['size']
-            occupied[
-                max(0, y - size[1]//2):min(occupied.shape[0], y + size[1]//2 + 1),
-                max(0, x - size[0]//2):min(occupied.shape[1], x + size[0]//2 + 1)
-            ] = True
-        
-        # Place props for each type
-        for prop_type in self.placer.prop_types.values():
-            # Calculate sun map (simplified)
-            sun_map = 1 - terrain_data['elevation'] * 0.5
-            
+        features = feature_data['features']
+        _mark_footprints(
+            occupied,
+            np.array([f['position'][1] for f in features], dtype=np.intp),
+            np.array([f['position'][0] for f in features], dtype=np.intp),
+            np.array([(f['size'][1] // 2, f['size'][0] // 2) for f in features], dtype=np.intp).reshape(-1, 2)
+        )
+        
+        # Calculate sun map (simplified), shared by every prop type
+        sun_map = 1 - terrain_data['elevation'] * 0.5
+        
+        # Score every prop type in one pass over the terrain
+        prop_types = list(self.placer.prop_types.values())
+        fits = self.placer.fit_all(
+            terrain_data['elevation'],
+            terrain_data['moisture'],
+            sun_map,
+            prop_types,
+            seed=seed
+        )
+        
+        # Place props for each type; occupancy grows as each type is placed
+        for prop_type, fit_map in zip(prop_types, fits):
             # Place props
             placement_map, cluster_centers = self.placer.place_props(
                 elevation_map=terrain_data['elevation'],
@@ -346,7 +530,8 @@ class PropLayer(BaseLayer):
                 sun_map=sun_map,
                 occupied_map=occupied,
                 prop_type=prop_type,
-                seed=seed
+                seed=seed,
+                fit_map=fit_map
             )
             
             # Add placed props
@@ -357,14 +542,12 @@ class PropLayer(BaseLayer):
                     'position': (x, y),
                     'cluster_size': prop_type.cluster_size
                 })
-                
-                # Mark as occupied
-                min_size, max_size = prop_type.cluster_size
-                size = np.random.randint(min_size, max_size + 1)
-                occupied[
-                    max(0, y - size):min(occupied.shape[0], y + size + 1),
-                    max(0, x - size):min(occupied.shape[1], x + size + 1)
-                ] = True
+            
+            # Mark as occupied
+            min_size, max_size = prop_type.cluster_size
+            sizes = rng.integers(min_size, max_size + 1, size=len(cluster_centers))
+            centers = np.array(cluster_centers, dtype=np.intp).reshape(-1, 2)
+            _mark_footprints(occupied, centers[:, 0], centers[:, 1], np.stack([sizes, sizes], axis=1))
         
         # Store debug state if enabled
         if self.config.debug_mode:
@@ -380,12 +563,12 @@ class VisualPolishLayer(BaseLayer):
     def __init__(self, config: VisualConfig):
         super().__init__(config)
         self.processor = VisualProcessor()
-        self.pipeline = StableDiffusionPipeline.from_pretrained(
-            "runwayml/stable-diffusion-v1-5",
-            torch_dtype=torch.float16
-        )
-        if torch.cuda.is_available():
-            self.pipeline = self.pipeline.to("cuda")
+        self.model_id = "runwayml/stable-diffusion-v1-5"
+    
+    @property
+    def pipeline(self) -> StableDiffusionPipeline:
+        """Stable Diffusion pipeline, loaded on first use"""
+        return _get_sd_pipeline(self.model_id)
     
     def generate(
         self,
@@ -393,6 +576,17 @@ class VisualPolishLayer(BaseLayer):
         style_prompt: str
     ) -> Dict:
         """Apply visual polish using the visual processor"""
+        rendered = self._render(scene_data, style_prompt)
+        if rendered is None:
+            return None
+        return self._polish(*rendered)
+    
+    def _render(
+        self,
+        scene_data: Dict,
+        style_prompt: str
+    ) -> Optional[Tuple[VisualStyle, str, Image.Image]]:
+        """Look up the style and generate the base image; safe to run on a worker thread"""
         if not self._validate_input(scene_data=scene_data, style_prompt=style_prompt):
             return None
         
@@ -406,11 +600,17 @@ class VisualPolishLayer(BaseLayer):
         prompt = self._create_scene_description(scene_data)
         image = self.pipeline(
             prompt,
-            num_inference_steps=50,
+            num_inference_steps=25,
             guidance_scale=7.5
         ).images[0]
         
-        # Apply visual style
+        return style, prompt, image
+    
+    def _polish(self, style: VisualStyle, prompt: str, image: Image.Image) -> Dict:
+        """Apply the visual style to a generated image
+        
+        apply_style launches parallel Numba kernels, so this runs on the main thread.
+        """
         image = self.processor.apply_style(
             image,
             style,
@@ -437,34 +637,23 @@ class VisualPolishLayer(BaseLayer):
         desc = "A detailed battlemap showing "
         
         # Add features
+        feature_desc = []
         if features:
-            feature_types = {}
-            for feature in features:
-                feature_type = feature['type']
-                feature_types[feature_type] = feature_types.get(feature_type, 0) + 1
-            
-            feature_desc = []
-            for feature_type, count in feature_types.items():
-                if count == 1:
-                    feature_desc.append(f"a {feature_type}")
-                else:
-                    feature_desc.append(f"{count} {feature_type}s")
+            feature_counts = Counter(feature['type'] for feature in features)
+            feature_desc = [
+                f"a {feature_type}" if count == 1 else f"{count} {feature_type}s"
+                for feature_type, count in feature_counts.items()
+            ]
             
             desc += ", ".join(feature_desc)
         
         # Add props
         if props:
-            prop_types = {}
-            for prop in props:
-                prop_type = prop['type']
-                prop_types[prop_type] = prop_types.get(prop_type, 0) + 1
-            
-            prop_desc = []
-            for prop_type, count in prop_types.items():
-                if count == 1:
-                    prop_desc.append(f"a {prop_type}")
-                else:
-                    prop_desc.append(f"{count} {prop_type}s")
+            prop_counts = Counter(prop['type'] for prop in props)
+            prop_desc = [
+                f"a {prop_type}" if count == 1 else f"{count} {prop_type}s"
+                for prop_type, count in prop_counts.items()
+            ]
             
             if feature_desc:
                 desc += " surrounded by "
@@ -495,6 +684,9 @@ class SceneGenerator:
         self.prop_layer = PropLayer(self.config.prop)
         self.visual_layer = VisualPolishLayer(self.config.visual)
         
+        # Compile terrain kernels before the first scene
+        self._warmup()
+        
         # Initialize asset generators
         self.asset_generator = AssetGenerator(output_dir="assets/textures")
         self.model_generator = ModelGenerator(output_dir="assets/models")
@@ -505,6 +697,44 @@ class SceneGenerator:
             format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
     
+    def _warmup(self):
+        """Run each Numba kernel on a tiny float32 input to take JIT cost off the first scene"""
+        elevation = np.zeros((2, 2), dtype=np.float32)
+        _fuse_layers(elevation, np.empty((4, 2, 2), dtype=np.float32))
+        _fit_kernel(
+            elevation,
+            elevation,
+            np.zeros((2, 2), dtype=bool),
+            0.0, 1.0, 0.0, 1.0,
+            np.empty((2, 2))
+        )
+        _gradient_products(
+            elevation,
+            np.empty((2, 2, 3), dtype=np.float32),
+            np.empty((2, 2), dtype=np.float32)
+        )
+        fits = np.empty((1, 2, 2), dtype=np.float32)
+        means = np.full(1, 0.5)
+        _fit_batch_kernel(elevation, elevation, elevation, elevation, elevation, means, means, means, means, fits)
+        placement = np.empty((2, 2), dtype=np.float32)
+        row_bounds = np.empty(2, dtype=np.float32)
+        for mask_kernel, normalize_threshold in (
+            (_mask_kernel, _normalize_threshold),
+            (_mask_kernel_serial, _normalize_threshold_serial)
+        ):
+            mask_kernel(fits[0], elevation, 1.0, placement, row_bounds, row_bounds)
+            normalize_threshold(placement, 0.0, 1.0, 0.5)
+        # Styles without saturation go through the lookup table build, the rest
+        # through a kernel specialized to their values
+        _tone_kernel(_LEVELS, 1.1, 1.2, 0.5, 1.0, 1.0, 1.0, np.empty((256, 1, 3), dtype=np.uint8))
+        processor = self.visual_layer.processor
+        pixels = np.zeros((2, 2, 3), dtype=np.uint8)
+        for style in processor.styles.values():
+            if style.saturation != 1.0:
+                red, blue = processor._temperature_scales(style.color_temperature)
+                kernel = _style_tone_kernel(style.brightness, style.contrast, style.saturation, red, blue)
+                kernel(pixels, 0.5, np.empty_like(pixels))
+    
     def generate(
         self,
         prompt: str,
@@ -542,27 +772,34 @@ class SceneGenerator:
         if not feature_data:
             return None
         
-        # Generate props
-        logger.info("Generating props...")
-        prop_data = self.prop_layer.generate(
-            terrain_data,
-            feature_data
-        )
+        # Run the image pipeline on a worker thread while props are placed;
+        # the image prompt only needs the feature layout
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            logger.info("Generating visual polish...")
+            render_future = executor.submit(
+                self.visual_layer._render,
+                {
+                    'features': feature_data['features'],
+                    'props': []
+                },
+                prompt
+            )
+            
+            # Generate props
+            logger.info("Generating props...")
+            prop_data = self.prop_layer.generate(
+                terrain_data,
+                feature_data
+            )
+            rendered = render_future.result()
         if not prop_data:
             return None
-        
-        # Generate visual polish
-        logger.info("Generating visual polish...")
-        visual_data = self.visual_layer.generate(
-            {
-                'features': feature_data['features'],
-                'props': prop_data['props']
-            },
-            prompt
-        )
-        if not visual_data:
+        if rendered is None:
             return None
         
+        # Style the image here, so only the main thread launches parallel kernels
+        visual_data = self.visual_layer._polish(*rendered)
+        
         # Combine all data
         scene_data = {
             'terrain': terrain_data,
@@ -604,8 +841,7 @@ class SceneGenerator:
         elevation = scene_data['terrain']['elevation']
         moisture = scene_data['terrain']['moisture']
         
-        # Create tilemap based on elevation and moisture
-        tilemap = np.zeros((elevation.shape[0], elevation.shape[1]), dtype=int)
+        # Tile type definitions
         tileset = {
             0: {'name': 'water', 'walkable': False},
             1: {'name': 'sand', 'walkable': True},
@@ -615,26 +851,18 @@ class SceneGenerator:
             5: {'name': 'snow', 'walkable': True}
         }
         
-        # Convert elevation and moisture to tile types
-        for y in range(elevation.shape[0]):
-            for x in range(elevation.shape[1]):
-                elev = elevation[y, x]
-                moist = moisture[y, x]
-                
-                # Determine tile type based on elevation and moisture
-                if elev < 0.2:
-                    tilemap[y, x] = 0  # Water
-                elif elev < 0.3:
-                    tilemap[y, x] = 1  # Sand
-                elif elev < 0.7:
-                    if moist > 0.6:
-                        tilemap[y, x] = 3  # Forest
-                    else:
-                        tilemap[y, x] = 2  # Grass
-                elif elev < 0.9:
-                    tilemap[y, x] = 4  # Mountain
-                else:
-                    tilemap[y, x] = 5  # Snow
+        # Convert elevation and moisture to tile types; first matching condition wins
+        tilemap = np.select(
+            [
+                elevation < 0.2,                       # Water
+                elevation < 0.3,                       # Sand
+                (elevation < 0.7) & (moisture > 0.6),  # Forest
+                elevation < 0.7,                       # Grass
+                elevation < 0.9                        # Mountain
+            ],
+            [0, 1, 3, 2, 4],
+            default=5                                  # Snow
+        ).astype(np.int32)
         
         # Convert features to placeable assets
         assets = []
@@ -693,62 +921,56 @@ class SceneGenerator:
             raise ValueError(f"Unsupported export format: {format}")
     
     def _export_to_unity(self, scene_data: Dict) -> Dict:
-        """Export scene data for Unity with 3D positioning and navigation data"""
+        """Export scene data for Unity with 3D positioning and navigation data
+        
+        The height map is packed with pack_array as base64 float32 bytes.
+        """
         # Extract terrain data
         elevation = scene_data['terrain']['elevation']
         moisture = scene_data['terrain']['moisture']
         
-        # Create navigation mesh data
-        nav_mesh = np.zeros_like(elevation, dtype=bool)
-        for y in range(elevation.shape[0]):
-            for x in range(elevation.shape[1]):
-                # Mark walkable areas (not water, not too steep)
-                elev = elevation[y, x]
-                nav_mesh[y, x] = elev >= 0.2 and elev < 0.9
+        # Create navigation mesh data: walkable areas are not water, not too steep
+        nav_mesh = (elevation >= 0.2) & (elevation < 0.9)
         
-        # Convert features to Unity prefab placements
-        features = []
-        for feature in scene_data['features']['features']:
-            x, y = feature['position']
-            # Convert 2D position to 3D (Unity uses y-up)
-            position = {
-                'x': float(x),
-                'y': float(elevation[y, x]),  # Use elevation for height
-                'z': float(y)
-            }
-            features.append({
+        # Convert features to Unity prefab placements (Unity uses y-up)
+        scene_features = scene_data['features']['features']
+        xs, ys = _gather_positions(scene_features)
+        features = [
+            {
                 'prefab_name': feature['type'],
-                'position': position,
+                'position': {'x': float(x), 'y': height, 'z': float(y)},  # Use elevation for height
                 'rotation': {'x': 0, 'y': 0, 'z': 0},  # Default rotation
                 'scale': {'x': 1, 'y': 1, 'z': 1},     # Default scale
                 'size': feature['size'],
                 'is_static': True,  # Features are static objects
                 'collider_enabled': True
-            })
+            }
+            for feature, x, y, height in zip(
+                scene_features, xs.tolist(), ys.tolist(), elevation[ys, xs].tolist()
+            )
+        ]
         
         # Convert props to Unity prefab placements
-        props = []
-        for prop in scene_data['props']['props']:
-            x, y = prop['position']
-            # Convert 2D position to 3D
-            position = {
-                'x': float(x),
-                'y': float(elevation[y, x]),
-                'z': float(y)
-            }
-            props.append({
+        scene_props = scene_data['props']['props']
+        xs, ys = _gather_positions(scene_props)
+        props = [
+            {
                 'prefab_name': prop['type'],
-                'position': position,
+                'position': {'x': float(x), 'y': height, 'z': float(y)},
                 'rotation': {'x': 0, 'y': 0, 'z': 0},
                 'scale': {'x': 1, 'y': 1, 'z': 1},
                 'cluster_size': prop['cluster_size'],
                 'is_static': True,
                 'collider_enabled': True
-            })
+            }
+            for prop, x, y, height in zip(
+                scene_props, xs.tolist(), ys.tolist(), elevation[ys, xs].tolist()
+            )
+        ]
         
         # Create terrain data for Unity Terrain component
         terrain_data = {
-            'height_map': elevation.tolist(),
+            'height_map': pack_array(elevation),
             'size': {
                 'width': elevation.shape[1],
                 'height': elevation.shape[0],
@@ -805,7 +1027,12 @@ class SceneGenerator:
         }
     
     def _export_to_web(self, scene_data: Dict) -> Dict:
-        """Export scene data for web"""
+        """Export scene data for web
+        
+        Terrain maps are packed with pack_array as base64 float32 bytes
+        rather than nested lists; SceneRenderer.unpackArray decodes them.
+        The nav mesh is bit-packed and walkable slopes are stored as float16.
+        """
         # Extract terrain data
         elevation = scene_data['terrain']['elevation']
         moisture = scene_data['terrain']['moisture']
@@ -823,12 +1050,12 @@ class SceneGenerator:
                 'width': elevation.shape[1],
                 'height': elevation.shape[0]
             },
-            'height_map': elevation.tolist(),
-            'moisture_map': moisture.tolist(),
-            'normal_map': normal_map.tolist(),
-            'slope_map': slope_map.tolist(),
+            'height_map': pack_array(elevation),
+            'moisture_map': pack_array(moisture),
+            'normal_map': pack_array(normal_map),
+            'slope_map': pack_array(slope_map),
             'height_layers': {
-                name: layer.tolist() for name, layer in height_layers.items()
+                name: pack_array(layer) for name, layer in height_layers.items()
             },
             'height_scale': 1.0,
             'texture_layers': [
@@ -884,42 +1111,43 @@ class SceneGenerator:
         }
         
         # Create navigation mesh with proper walkable areas
-        nav_mesh = np.zeros_like(elevation, dtype=bool)
-        for y in range(elevation.shape[0]):
-            for x in range(elevation.shape[1]):
-                # Determine if walkable based on height and slope
-                nav_mesh[y, x] = (
-                    elevation[y, x] >= 0.2 and elevation[y, x] < 0.9 and  # Height constraints
-                    slope_map[y, x] < 45.0     # Slope constraint
-                )
+        nav_mesh = (
+            (elevation >= 0.2) & (elevation < 0.9) &  # Height constraints
+            (slope_map < 45.0)                        # Slope constraint
+        )
+        
+        # Gather features into columns and look up their heights in one pass
+        scene_features = scene_data['features']['features']
+        batch = EntityBatch.from_items(scene_features, 'size')
+        elevs = elevation[batch.ys, batch.xs]
+        
+        # Draw fallback yaws for features without a rotation in one call
+        yaws = np.random.uniform(0, 360, size=len(scene_features))
+        
+        # Resolve model, texture and color once per feature type
+        feature_assets = {
+            feature_type: (
+                models['features'][feature_type],
+                textures['features'][feature_type],
+                self._get_feature_color(feature_type)
+            )
+            for feature_type in set(batch.types)
+        }
         
         # Process features with proper 3D data
-        features = []
-        for f in scene_data['features']['features']:
-            x, y = f['position']
-            elev = float(elevation[y, x])
-            
-            # Handle size tuple
-            size = f['size']
-            if isinstance(size, tuple):
-                scale_x = float(size[0])
-                scale_y = float(size[1]) if len(size) > 1 else scale_x
-                scale_z = float(size[2]) if len(size) > 2 else scale_x
-            else:
-                scale_x = scale_y = scale_z = float(size)
-            
-            features.append({
-                'type': f['type'],
+        features = [
+            {
+                'type': feature_type,
                 'position': {
                     'x': float(x),
                     'y': elev,
                     'z': float(y)
                 },
-                'rotation': f.get('rotation', {
+                'rotation': f['rotation'] if 'rotation' in f else {
                     'x': 0,
-                    'y': np.random.uniform(0, 360),
+                    'y': yaw,
                     'z': 0
-                }),
+                },
                 'scale': {
                     'x': scale_x,
                     'y': scale_y,
@@ -927,39 +1155,55 @@ class SceneGenerator:
                 },
                 'normal': f.get('normal', [0, 1, 0]),
                 'slope': float(f.get('slope', 0)),
-                'model': models['features'][f['type']],
-                'texture': textures['features'][f['type']],
+                'model': feature_assets[feature_type][0],
+                'texture': feature_assets[feature_type][1],
                 'material': {
-                    'color': self._get_feature_color(f['type']),
+                    'color': feature_assets[feature_type][2],
                     'roughness': 0.8,
                     'metalness': 0.2,
                     'normal_scale': 1.0
                 }
-            })
+            }
+            for f, feature_type, x, y, elev, yaw, (scale_x, scale_y, scale_z) in zip(
+                scene_features, batch.types, batch.xs.tolist(), batch.ys.tolist(),
+                elevs.tolist(), yaws.tolist(), batch.scales.tolist()
+            )
+        ]
+        
+        # Gather props into columns and look up heights, slopes and normals in one pass
+        batch = EntityBatch.from_items(scene_data['props']['props'], 'cluster_size')
+        xs, ys = batch.xs, batch.ys
+        elevs = elevation[ys, xs]
+        slopes = slope_map[ys, xs]
+        
+        # Border cells get a flat up-facing normal
+        interior = (
+            (ys > 0) & (ys < normal_map.shape[0] - 1) &
+            (xs > 0) & (xs < normal_map.shape[1] - 1)
+        )
+        normals = np.where(
+            interior[:, None],
+            normal_map[np.clip(ys, 1, normal_map.shape[0] - 2), np.clip(xs, 1, normal_map.shape[1] - 2)],
+            np.array([0, 1, 0], dtype=normal_map.dtype)
+        )
+        
+        # Calculate rotations to align with normals
+        rotations = self.feature_layer._calculate_rotations_from_normals(normals)
+        
+        # Resolve model, texture and color once per prop type
+        prop_assets = {
+            prop_type: (
+                models.get('props', {}).get(prop_type) or models.get('features', {}).get(prop_type),
+                textures.get('features', {}).get(prop_type) or textures.get('props', {}).get(prop_type),
+                self._get_prop_color(prop_type)
+            )
+            for prop_type in set(batch.types)
+        }
         
         # Process props with proper 3D data
-        props = []
-        for p in scene_data['props']['props']:
-            x, y = p['position']
-            elev = float(elevation[y, x])
-            
-            # Calculate normal at prop position
-            normal = normal_map[y, x] if y > 0 and y < normal_map.shape[0]-1 and x > 0 and x < normal_map.shape[1]-1 else [0, 1, 0]
-            
-            # Calculate rotation to align with normal
-            rotation = self.feature_layer._calculate_rotation_from_normal(normal)
-            
-            # Handle cluster size
-            cluster_size = p['cluster_size']
-            if isinstance(cluster_size, tuple):
-                scale_x = float(cluster_size[0])
-                scale_y = float(cluster_size[1]) if len(cluster_size) > 1 else scale_x
-                scale_z = float(cluster_size[2]) if len(cluster_size) > 2 else scale_x
-            else:
-                scale_x = scale_y = scale_z = float(cluster_size)
-            
-            props.append({
-                'type': p['type'],
+        props = [
+            {
+                'type': prop_type,
                 'position': {
                     'x': float(x),
                     'y': elev,
@@ -971,25 +1215,30 @@ class SceneGenerator:
                     'y': scale_y,
                     'z': scale_z
                 },
-                'normal': normal if isinstance(normal, list) else normal.tolist(),
-                'slope': float(slope_map[y, x]),
-                'model': models.get('props', {}).get(p['type']) or models.get('features', {}).get(p['type']),
-                'texture': textures.get('features', {}).get(p['type']) or textures.get('props', {}).get(p['type']),
+                'normal': normal,
+                'slope': slope,
+                'model': prop_assets[prop_type][0],
+                'texture': prop_assets[prop_type][1],
                 'material': {
-                    'color': self._get_prop_color(p['type']),
+                    'color': prop_assets[prop_type][2],
                     'roughness': 0.8,
                     'metalness': 0.2,
                     'normal_scale': 1.0
                 }
-            })
+            }
+            for prop_type, x, y, elev, slope, normal, rotation, (scale_x, scale_y, scale_z) in zip(
+                batch.types, xs.tolist(), ys.tolist(), elevs.tolist(), slopes.tolist(),
+                normals.tolist(), rotations, batch.scales.tolist()
+            )
+        ]
         
         return {
             'terrain': terrain_data,
             'features': features,
             'props': props,
             'navigation': {
-                'nav_mesh': nav_mesh.tolist(),
-                'walkable_slopes': slope_map.tolist(),
+                'nav_mesh': pack_array(nav_mesh, 'bool'),
+                'walkable_slopes': pack_array(slope_map, 'float16'),
                 'walkable_height': 2.0,
                 'walkable_radius': 0.5,
                 'walkable_climb': 0.5,
@@ -1007,48 +1256,28 @@ class SceneGenerator:
     
     def _get_feature_color(self, feature_type: str) -> str:
         """Get color for feature type"""
-        colors = {
-            'tree': '#2d5a27',
-            'rock': '#808080',
-            'building': '#8b4513',
-            'water': '#0077be',
-            'mountain': '#696969'
-        }
-        return colors.get(feature_type.lower(), '#808080')
+        return _FEATURE_COLORS.get(feature_type.lower(), '#808080')
     
     def _get_prop_color(self, prop_type: str) -> str:
         """Get color for prop type"""
-        colors = {
-            'bush': '#355e3b',
-            'flower': '#ff69b4',
-            'stone': '#808080',
-            'log': '#8b4513',
-            'mushroom': '#ff4500'
-        }
-        return colors.get(prop_type.lower(), '#808080')
+        return _PROP_COLORS.get(prop_type.lower(), '#808080')
     
     def _export_to_blender(self, scene_data: Dict) -> Dict:
         """Export scene data for Blender"""
         # Extract only the necessary data for Blender
+        get_feature = itemgetter('type', 'position', 'size')
+        get_prop = itemgetter('type', 'position', 'cluster_size')
         return {
             'terrain': {
                 'elevation': scene_data['terrain']['elevation'],
                 'moisture': scene_data['terrain']['moisture']
             },
             'features': [
-                {
-                    'type': f['type'],
-                    'position': f['position'],
-                    'size': f['size']
-                }
-                for f in scene_data['features']['features']
+                {'type': t, 'position': position, 'size': size}
+                for t, position, size in map(get_feature, scene_data['features']['features'])
             ],
             'props': [
-                {
-                    'type': p['type'],
-                    'position': p['position'],
-                    'cluster_size': p['cluster_size']
-                }
-                for p in scene_data['props']['props']
+                {'type': t, 'position': position, 'cluster_size': cluster_size}
+                for t, position, cluster_size in map(get_prop, scene_data['props']['props'])
             ]
         } 
\ No newline at end of file
@@ -1,6 +1,15 @@
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 import numpy as np
+import hashlib
+import inspect
 import json
+import os
+import re
+import sys
+import tempfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 import logging
 import trimesh
@@ -9,12 +18,126 @@ from trimesh.transformations import translation_matrix, rotation_matrix
 
 logger = logging.getLogger(__name__)
 
+_PRIMITIVES = {
+    'cylinder': cylinder,
+    'box': box,
+    'icosphere': icosphere,
+    'cone': cone
+}
+
+@lru_cache(maxsize=64)
+def _primitive_template(kind: str, **params) -> trimesh.Trimesh:
+    """Build a primitive mesh once per (kind, params)
+    
+    The template is shared across models and threads, so its vertex and face
+    buffers are read-only; copy it before handing it to anything that mutates.
+    """
+    # Revolved primitives keep trimesh's vertex merge so they stay watertight;
+    # caching means it runs once per shape rather than once per model
+    mesh = _PRIMITIVES[kind](**params)
+    mesh.vertices.flags.writeable = False
+    mesh.faces.flags.writeable = False
+    return mesh
+
+@lru_cache(maxsize=1)
+def _source_key() -> str:
+    """Hash of this module's source and the trimesh version, so any edit to a generator or helper invalidates cached models"""
+    source = inspect.getsource(sys.modules[__name__]) + trimesh.__version__
+    return hashlib.blake2b(source.encode(), digest_size=8).hexdigest()
+
+def _write_glb(mesh: Union[trimesh.Trimesh, trimesh.Scene], output_path: Path):
+    """Export mesh as GLB to a temporary file beside output_path and move it into place
+    
+    The move is atomic, so a model file that exists is always complete.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=output_path.parent, prefix=output_path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            mesh.export(f, file_type='glb')
+        os.replace(temp_path, output_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def _assemble(parts: List[Tuple[trimesh.Trimesh, Optional[np.ndarray]]]) -> trimesh.Trimesh:
+    """Write each (mesh, transform) part into one preallocated vertex/face buffer"""
+    vertex_count = sum(len(mesh.vertices) for mesh, _ in parts)
+    face_count = sum(len(mesh.faces) for mesh, _ in parts)
+    # float64/int64 match trimesh's own storage, so the buffers are adopted
+    # without a copy; float32 input would be upcast again on construction
+    vertices = np.empty((vertex_count, 3), dtype=np.float64)
+    faces = np.empty((face_count, 3), dtype=np.int64)
+    
+    v = f = 0
+    for mesh, transform in parts:
+        nv, nf = len(mesh.vertices), len(mesh.faces)
+        if transform is None:
+            vertices[v:v + nv] = mesh.vertices
+        else:
+            np.matmul(mesh.vertices, transform[:3, :3].T, out=vertices[v:v + nv])
+            vertices[v:v + nv] += transform[:3, 3]
+        np.add(mesh.faces, v, out=faces[f:f + nf])
+        v += nv
+        f += nf
+    
+    return trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+
+def _translations(offsets: np.ndarray) -> np.ndarray:
+    """(N, 4, 4) translation matrices for (N, 3) offsets"""
+    transforms = np.tile(np.eye(4), (len(offsets), 1, 1))
+    transforms[:, :3, 3] = offsets
+    return transforms
+
+def _instance(parts: List[Tuple[trimesh.Trimesh, Optional[np.ndarray]]]) -> trimesh.Scene:
+    """Add each (mesh, transform) part as a scene node, sharing one geometry per repeated primitive
+    
+    Each distinct mesh is copied once into the scene, so the cached templates
+    never belong to a scene and placement only ever moves scene graph nodes.
+    """
+    scene = trimesh.Scene()
+    geometry_names = {}
+    for i, (mesh, transform) in enumerate(parts):
+        transform = np.eye(4) if transform is None else transform
+        
+        # Cached primitives with equal params are the same object
+        name = geometry_names.get(id(mesh))
+        if name is None:
+            name = geometry_names[id(mesh)] = f"part_{len(geometry_names)}"
+            scene.add_geometry(mesh.copy(), geom_name=name, node_name=f"node_{i}", transform=transform)
+        else:
+            scene.graph.update(
+                frame_from=scene.graph.base_frame,
+                frame_to=f"node_{i}",
+                geometry=name,
+                matrix=transform
+            )
+    return scene
+
 class ModelGenerator:
-    def __init__(self, output_dir: str = "assets/models"):
+    # Category of each generate_<name>_model, and whether it draws from self._rng
+    _MODELS = {
+        "tree": ("features", False),
+        "rock": ("features", True),
+        "building": ("features", False),
+        "temple": ("features", False),
+        "ruins": ("features", True),
+        "well": ("features", False),
+        "camp": ("features", False),
+        "dungeon": ("features", False),
+        "bridge": ("features", False),
+        "tower": ("features", False),
+        "bush": ("props", True),
+        "flower": ("props", False),
+        "stone": ("props", True)
+    }
+    
+    def __init__(self, output_dir: str = "assets/models", seed: Optional[int] = None):
         """Initialize model generator
         
         Args:
             output_dir: Directory to save generated models
+            seed: Seed for the random model variations (random if None, in
+                which case the randomized models are rebuilt on every run)
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -22,262 +145,273 @@ class ModelGenerator:
         # Create subdirectories
         (self.output_dir / "features").mkdir(exist_ok=True)
         (self.output_dir / "props").mkdir(exist_ok=True)
+        
+        # Base seed for the per-model random generators; only a given seed makes them cacheable
+        self.seed = np.random.SeedSequence(seed).entropy
+        self._seeded = seed is not None
+        
+        # Writer threads so GLB export overlaps building the next mesh
+        self._export_pool = ThreadPoolExecutor(max_workers=2)
+        self._pending_exports = []
+    
+    def _rng(self, name: str) -> np.random.Generator:
+        """Random generator for one model, independent of other models and threads"""
+        return np.random.default_rng([self.seed, zlib.crc32(name.encode())])
+    
+    def _export(self, mesh: Union[trimesh.Trimesh, trimesh.Scene], output_path: Path) -> Path:
+        """Queue a GLB export on the writer threads and return its path"""
+        self._pending_exports.append(self._export_pool.submit(_write_glb, mesh, output_path))
+        return output_path
+    
+    def wait_for_exports(self):
+        """Block until every queued export is written, re-raising any export error"""
+        pending, self._pending_exports = self._pending_exports, []
+        for future in pending:
+            future.result()
+    
+    def _is_random(self, name: str) -> bool:
+        """Whether a model is registered as drawing from its random generator"""
+        return self._MODELS[name][1]
+    
+    def _output_path(self, category: str, name: str) -> Path:
+        """Model path keyed by a hash of the module source, plus the seed for seeded random models"""
+        key = _source_key()
+        if self._seeded and self._is_random(name):
+            key = hashlib.blake2b(f"{key}{self.seed}".encode(), digest_size=8).hexdigest()
+        return self.output_dir / category / f"{name}.{key}.glb"
+    
+    def _prune_stale(self, output_path: Path):
+        """Delete model files of the same name left by earlier sources or seeds
+        
+        Only names of the form <name>.<16 hex digit key>.glb are touched.
+        """
+        name = output_path.name.split(".", 1)[0]
+        keyed = re.compile(rf"{re.escape(name)}\.[0-9a-f]{{16}}\.glb")
+        for stale in output_path.parent.glob(f"{name}.*.glb"):
+            if stale != output_path and keyed.fullmatch(stale.name):
+                stale.unlink(missing_ok=True)
     
     def generate_tree_model(self) -> Path:
         """Generate a simple tree model"""
         # Create trunk
-        trunk = cylinder(radius=0.2, height=2.0)
-        trunk.apply_transform(translation_matrix([0, 1, 0]))
+        trunk = (_primitive_template('cylinder', radius=0.2, height=2.0), translation_matrix([0, 1, 0]))
         
         # Create leaves
-        leaves = cone(radius=1.0, height=2.0)
-        leaves.apply_transform(translation_matrix([0, 2.5, 0]))
+        leaves = (_primitive_template('cone', radius=1.0, height=2.0), translation_matrix([0, 2.5, 0]))
         
         # Combine meshes
-        tree = trimesh.util.concatenate([trunk, leaves])
+        tree = _assemble([trunk, leaves])
         
         # Save model
-        output_path = self.output_dir / "features" / "tree.glb"
-        tree.export(output_path)
-        return output_path
+        output_path = self._output_path("features", "tree")
+        return self._export(tree, output_path)
     
     def generate_rock_model(self) -> Path:
         """Generate a simple rock model"""
+        rng = self._rng("rock")
+        
         # Create base rock shape
-        rock = icosphere(subdivisions=2, radius=1.0)
+        template = _primitive_template('icosphere', subdivisions=2, radius=1.0)
         
         # Add some deformation
-        vertices = rock.vertices
-        for i in range(len(vertices)):
-            # Add random displacement
-            displacement = np.random.normal(0, 0.2, 3)
-            vertices[i] += displacement
-        
-        # Update mesh
-        rock.vertices = vertices
+        rock = trimesh.Trimesh(
+            vertices=template.vertices + rng.normal(0, 0.2, template.vertices.shape),
+            faces=template.faces.copy(),
+            process=False
+        )
         rock.fix_normals()
         
         # Save model
-        output_path = self.output_dir / "features" / "rock.glb"
-        rock.export(output_path)
-        return output_path
+        output_path = self._output_path("features", "rock")
+        return self._export(rock, output_path)
     
     def generate_building_model(self) -> Path:
         """Generate a simple building model"""
         # Create base building
-        building = box(extents=[2, 2, 2])
+        building = (_primitive_template('box', extents=(2, 2, 2)), None)
         
         # Create roof
-        roof = cone(radius=1.5, height=1.0)
-        roof.apply_transform(translation_matrix([0, 2, 0]))
+        roof = (_primitive_template('cone', radius=1.5, height=1.0), translation_matrix([0, 2, 0]))
         
         # Combine meshes
-        house = trimesh.util.concatenate([building, roof])
+        house = _assemble([building, roof])
         
         # Save model
-        output_path = self.output_dir / "features" / "building.glb"
-        house.export(output_path)
-        return output_path
+        output_path = self._output_path("features", "building")
+        return self._export(house, output_path)
     
     def generate_bush_model(self) -> Path:
         """Generate a simple bush model"""
+        rng = self._rng("bush")
+        
         # Create multiple spheres for bush
         spheres = []
         for _ in range(5):
             # Random position within bounds
-            pos = np.random.uniform(-0.5, 0.5, 3)
+            pos = rng.uniform(-0.5, 0.5, 3)
             pos[1] = abs(pos[1])  # Keep above ground
             
             # Random size
-            radius = np.random.uniform(0.3, 0.5)
+            radius = rng.uniform(0.3, 0.5)
             
             # Create sphere
-            sphere_mesh = icosphere(subdivisions=2, radius=radius)
-            sphere_mesh.apply_transform(translation_matrix(pos))
-            spheres.append(sphere_mesh)
+            sphere_mesh = _primitive_template('icosphere', subdivisions=2, radius=1.0)
+            transform = translation_matrix(pos) @ np.diag([radius, radius, radius, 1.0])
+            spheres.append((sphere_mesh, transform))
         
         # Combine meshes
-        bush = trimesh.util.concatenate(spheres)
+        bush = _instance(spheres)
         
         # Save model
-        output_path = self.output_dir / "props" / "bush.glb"
-        bush.export(output_path)
-        return output_path
+        output_path = self._output_path("props", "bush")
+        return self._export(bush, output_path)
     
     def generate_flower_model(self) -> Path:
         """Generate a simple flower model"""
         # Create stem
-        stem = cylinder(radius=0.05, height=0.5)
+        stem = (_primitive_template('cylinder', radius=0.05, height=0.5), None)
         
         # Create petals
-        petals = []
-        for i in range(5):
-            # Create petal
-            petal = icosphere(subdivisions=2, radius=0.1)
-            
-            # Position petal
-            angle = i * (2 * np.pi / 5)
-            pos = np.array([
-                0.1 * np.cos(angle),
-                0.5 + 0.1 * np.sin(angle),
-                0.1 * np.sin(angle)
-            ])
-            petal.apply_transform(translation_matrix(pos))
-            petals.append(petal)
+        petal = _primitive_template('icosphere', subdivisions=2, radius=0.1)
+        
+        # Position petals evenly around the stem top
+        angles = np.linspace(0, 2 * np.pi, 5, endpoint=False)
+        offsets = np.stack([
+            0.1 * np.cos(angles),
+            0.5 + 0.1 * np.sin(angles),
+            0.1 * np.sin(angles)
+        ], axis=1)
+        petals = [(petal, transform) for transform in _translations(offsets)]
         
         # Create center
-        center = icosphere(subdivisions=2, radius=0.1)
-        center.apply_transform(translation_matrix([0, 0.5, 0]))
+        center = (_primitive_template('icosphere', subdivisions=2, radius=0.1), translation_matrix([0, 0.5, 0]))
         
         # Combine meshes
-        flower = trimesh.util.concatenate([stem, center] + petals)
+        flower = _instance([stem, center] + petals)
         
         # Save model
-        output_path = self.output_dir / "props" / "flower.glb"
-        flower.export(output_path)
-        return output_path
+        output_path = self._output_path("props", "flower")
+        return self._export(flower, output_path)
     
     def generate_stone_model(self) -> Path:
         """Generate a simple stone model"""
+        rng = self._rng("stone")
+        
         # Create base stone
-        stone = icosphere(subdivisions=2, radius=0.3)
+        template = _primitive_template('icosphere', subdivisions=2, radius=0.3)
         
         # Add some deformation
-        vertices = stone.vertices
-        for i in range(len(vertices)):
-            # Add random displacement
-            displacement = np.random.normal(0, 0.1, 3)
-            vertices[i] += displacement
-        
-        # Update mesh
-        stone.vertices = vertices
+        stone = trimesh.Trimesh(
+            vertices=template.vertices + rng.normal(0, 0.1, template.vertices.shape),
+            faces=template.faces.copy(),
+            process=False
+        )
         stone.fix_normals()
         
         # Save model
-        output_path = self.output_dir / "props" / "stone.glb"
-        stone.export(output_path)
-        return output_path
+        output_path = self._output_path("props", "stone")
+        return self._export(stone, output_path)
     
     def generate_temple_model(self) -> Path:
         """Generate a temple model"""
         # Create base platform
-        platform = box(extents=[4, 0.5, 4])
+        platform = (_primitive_template('box', extents=(4, 0.5, 4)), None)
         
         # Create main building
-        building = box(extents=[3, 2, 3])
-        building.apply_transform(translation_matrix([0, 1.25, 0]))
+        building = (_primitive_template('box', extents=(3, 2, 3)), translation_matrix([0, 1.25, 0]))
         
         # Create roof
-        roof = cone(radius=2.5, height=2.0)
-        roof.apply_transform(translation_matrix([0, 3, 0]))
+        roof = (_primitive_template('cone', radius=2.5, height=2.0), translation_matrix([0, 3, 0]))
         
         # Create pillars
-        pillars = []
-        for i in range(4):
-            angle = i * (np.pi / 2)
-            x = 2 * np.cos(angle)
-            z = 2 * np.sin(angle)
-            
-            pillar = cylinder(radius=0.2, height=3.0)
-            pillar.apply_transform(translation_matrix([x, 1.5, z]))
-            pillars.append(pillar)
+        pillar = _primitive_template('cylinder', radius=0.2, height=3.0)
+        angles = np.linspace(0, 2 * np.pi, 4, endpoint=False)
+        offsets = np.stack([2 * np.cos(angles), np.full(4, 1.5), 2 * np.sin(angles)], axis=1)
+        pillars = [(pillar, transform) for transform in _translations(offsets)]
         
         # Combine meshes
-        temple = trimesh.util.concatenate([platform, building, roof] + pillars)
+        temple = _instance([platform, building, roof] + pillars)
         
         # Save model
-        output_path = self.output_dir / "features" / "temple.glb"
-        temple.export(output_path)
-        return output_path
+        output_path = self._output_path("features", "temple")
+        return self._export(temple, output_path)
     
     def generate_ruins_model(self) -> Path:
         """Generate ruins model"""
+        rng = self._rng("ruins")
+        
         # Create base platform
-        platform = box(extents=[3, 0.5, 3])
+        platform = (_primitive_template('box', extents=(3, 0.5, 3)), None)
         
-        # Create broken walls
-        walls = []
-        for i in range(4):
-            angle = i * (np.pi / 2)
-            x = 1.5 * np.cos(angle)
-            z = 1.5 * np.sin(angle)
-            
-            # Random height for broken wall
-            height = np.random.uniform(0.5, 2.0)
-            wall = box(extents=[0.3, height, 1.5])
-            wall.apply_transform(translation_matrix([x, height/2, z]))
-            walls.append(wall)
+        # Create broken walls with random heights
+        wall = _primitive_template('box', extents=(1, 1, 1))
+        heights = rng.uniform(0.5, 2.0, 4)
+        angles = np.linspace(0, 2 * np.pi, 4, endpoint=False)
+        transforms = _translations(np.stack([1.5 * np.cos(angles), heights / 2, 1.5 * np.sin(angles)], axis=1))
+        
+        # Scale the unit box to each wall's size
+        transforms[:, 0, 0] = 0.3
+        transforms[:, 1, 1] = heights
+        transforms[:, 2, 2] = 1.5
+        walls = [(wall, transform) for transform in transforms]
         
         # Combine meshes
-        ruins = trimesh.util.concatenate([platform] + walls)
+        ruins = _instance([platform] + walls)
         
         # Save model
-        output_path = self.output_dir / "features" / "ruins.glb"
-        ruins.export(output_path)
-        return output_path
+        output_path = self._output_path("features", "ruins")
+        return self._export(ruins, output_path)
     
     def generate_well_model(self) -> Path:
         """Generate a well model"""
         # Create base
-        base = cylinder(radius=1.0, height=0.5)
+        base = (_primitive_template('cylinder', radius=1.0, height=0.5), None)
         
         # Create well walls
-        walls = cylinder(radius=0.8, height=1.0)
-        walls.apply_transform(translation_matrix([0, 0.75, 0]))
+        walls = (_primitive_template('cylinder', radius=0.8, height=1.0), translation_matrix([0, 0.75, 0]))
         
         # Create roof structure
-        roof = cone(radius=1.2, height=1.0)
-        roof.apply_transform(translation_matrix([0, 2, 0]))
+        roof = (_primitive_template('cone', radius=1.2, height=1.0), translation_matrix([0, 2, 0]))
         
         # Combine meshes
-        well = trimesh.util.concatenate([base, walls, roof])
+        well = _assemble([base, walls, roof])
         
         # Save model
-        output_path = self.output_dir / "features" / "well.glb"
-        well.export(output_path)
-        return output_path
+        output_path = self._output_path("features", "well")
+        return self._export(well, output_path)
     
     def generate_camp_model(self) -> Path:
         """Generate a camp model"""
         # Create base platform
-        platform = box(extents=[3, 0.2, 3])
+        platform = (_primitive_template('box', extents=(3, 0.2, 3)), None)
         
         # Create tent
-        tent_base = box(extents=[2, 0.1, 2])
-        tent_base.apply_transform(translation_matrix([0, 0.15, 0]))
+        tent_base = (_primitive_template('box', extents=(2, 0.1, 2)), translation_matrix([0, 0.15, 0]))
         
         # Create tent roof
-        tent_roof = cone(radius=1.5, height=1.5)
-        tent_roof.apply_transform(translation_matrix([0, 1.0, 0]))
+        tent_roof = (_primitive_template('cone', radius=1.5, height=1.5), translation_matrix([0, 1.0, 0]))
         
         # Create campfire
-        fire_base = cylinder(radius=0.3, height=0.1)
-        fire_base.apply_transform(translation_matrix([1.0, 0.2, 0]))
+        fire_base = (_primitive_template('cylinder', radius=0.3, height=0.1), translation_matrix([1.0, 0.2, 0]))
         
         # Create fire logs
-        logs = []
-        for i in range(3):
-            angle = i * (2 * np.pi / 3)
-            x = 1.0 + 0.2 * np.cos(angle)
-            z = 0.2 * np.sin(angle)
-            
-            log = cylinder(radius=0.05, height=0.4)
-            log.apply_transform(translation_matrix([x, 0.3, z]))
-            log.apply_transform(rotation_matrix(np.pi/4, [0, 0, 1]))
-            logs.append(log)
+        log = _primitive_template('cylinder', radius=0.05, height=0.4)
+        angles = np.linspace(0, 2 * np.pi, 3, endpoint=False)
+        offsets = np.stack([1.0 + 0.2 * np.cos(angles), np.full(3, 0.3), 0.2 * np.sin(angles)], axis=1)
+        transforms = rotation_matrix(np.pi/4, [0, 0, 1]) @ _translations(offsets)
+        logs = [(log, transform) for transform in transforms]
         
         # Combine meshes
-        camp = trimesh.util.concatenate([platform, tent_base, tent_roof, fire_base] + logs)
+        camp = _instance([platform, tent_base, tent_roof, fire_base] + logs)
         
         # Save model
-        output_path = self.output_dir / "features" / "camp.glb"
-        camp.export(output_path)
-        return output_path
+        output_path = self._output_path("features", "camp")
+        return self._export(camp, output_path)
     
     def generate_dungeon_model(self) -> Path:
         """Generate a dungeon model"""
         # Create base platform
-        platform = box(extents=[4, 0.5, 4])
+        platform = (_primitive_template('box', extents=(4, 0.5, 4)), None)
         
         # Create walls
         walls = []
@@ -285,24 +419,20 @@ class ModelGenerator:
         wall_thickness = 0.3
         
         # North wall
-        north_wall = box(extents=[4, wall_height, wall_thickness])
-        north_wall.apply_transform(translation_matrix([0, wall_height/2, 2]))
-        walls.append(north_wall)
+        north_wall = _primitive_template('box', extents=(4, wall_height, wall_thickness))
+        walls.append((north_wall, translation_matrix([0, wall_height/2, 2])))
         
         # South wall
-        south_wall = box(extents=[4, wall_height, wall_thickness])
-        south_wall.apply_transform(translation_matrix([0, wall_height/2, -2]))
-        walls.append(south_wall)
+        south_wall = _primitive_template('box', extents=(4, wall_height, wall_thickness))
+        walls.append((south_wall, translation_matrix([0, wall_height/2, -2])))
         
         # East wall
-        east_wall = box(extents=[wall_thickness, wall_height, 4])
-        east_wall.apply_transform(translation_matrix([2, wall_height/2, 0]))
-        walls.append(east_wall)
+        east_wall = _primitive_template('box', extents=(wall_thickness, wall_height, 4))
+        walls.append((east_wall, translation_matrix([2, wall_height/2, 0])))
         
         # West wall
-        west_wall = box(extents=[wall_thickness, wall_height, 4])
-        west_wall.apply_transform(translation_matrix([-2, wall_height/2, 0]))
-        walls.append(west_wall)
+        west_wall = _primitive_template('box', extents=(wall_thickness, wall_height, 4))
+        walls.append((west_wall, translation_matrix([-2, wall_height/2, 0])))
         
         # Add pillars in corners
         pillars = []
@@ -310,9 +440,8 @@ class ModelGenerator:
             (1.5, 1.5), (1.5, -1.5), (-1.5, 1.5), (-1.5, -1.5)
         ]
         for x, z in pillar_positions:
-            pillar = cylinder(radius=0.2, height=wall_height)
-            pillar.apply_transform(translation_matrix([x, wall_height/2, z]))
-            pillars.append(pillar)
+            pillar = _primitive_template('cylinder', radius=0.2, height=wall_height)
+            pillars.append((pillar, translation_matrix([x, wall_height/2, z])))
         
         # Add some decorative elements
         decorations = []
@@ -322,26 +451,23 @@ class ModelGenerator:
             (1.8, 1.8), (1.8, -1.8), (-1.8, 1.8), (-1.8, -1.8)
         ]
         for x, z in sconce_positions:
-            sconce = box(extents=[0.2, 0.2, 0.2])
-            sconce.apply_transform(translation_matrix([x, wall_height/2, z]))
-            decorations.append(sconce)
+            sconce = _primitive_template('box', extents=(0.2, 0.2, 0.2))
+            decorations.append((sconce, translation_matrix([x, wall_height/2, z])))
         
         # Combine all meshes
-        dungeon = trimesh.util.concatenate([platform] + walls + pillars + decorations)
+        dungeon = _instance([platform] + walls + pillars + decorations)
         
         # Save model
-        output_path = self.output_dir / "features" / "dungeon.glb"
-        dungeon.export(output_path)
-        return output_path
+        output_path = self._output_path("features", "dungeon")
+        return self._export(dungeon, output_path)
     
     def generate_bridge_model(self) -> Path:
         """Generate a bridge model"""
         # Create base platform
-        platform = box(extents=[4, 0.3, 2])
+        platform = (_primitive_template('box', extents=(4, 0.3, 2)), None)
         
         # Create bridge deck
-        deck = box(extents=[3.8, 0.1, 1.8])
-        deck.apply_transform(translation_matrix([0, 0.2, 0]))
+        deck = (_primitive_template('box', extents=(3.8, 0.1, 1.8)), translation_matrix([0, 0.2, 0]))
         
         # Create bridge railings
         railings = []
@@ -349,14 +475,12 @@ class ModelGenerator:
         railing_thickness = 0.1
         
         # North railing
-        north_railing = box(extents=[3.8, railing_height, railing_thickness])
-        north_railing.apply_transform(translation_matrix([0, railing_height/2, 0.9]))
-        railings.append(north_railing)
+        north_railing = _primitive_template('box', extents=(3.8, railing_height, railing_thickness))
+        railings.append((north_railing, translation_matrix([0, railing_height/2, 0.9])))
         
         # South railing
-        south_railing = box(extents=[3.8, railing_height, railing_thickness])
-        south_railing.apply_transform(translation_matrix([0, railing_height/2, -0.9]))
-        railings.append(south_railing)
+        south_railing = _primitive_template('box', extents=(3.8, railing_height, railing_thickness))
+        railings.append((south_railing, translation_matrix([0, railing_height/2, -0.9])))
         
         # Create support pillars
         pillars = []
@@ -364,30 +488,26 @@ class ModelGenerator:
             (-1.5, -0.8), (-1.5, 0.8), (1.5, -0.8), (1.5, 0.8)
         ]
         for x, z in pillar_positions:
-            pillar = cylinder(radius=0.2, height=1.0)
-            pillar.apply_transform(translation_matrix([x, -0.5, z]))
-            pillars.append(pillar)
+            pillar = _primitive_template('cylinder', radius=0.2, height=1.0)
+            pillars.append((pillar, translation_matrix([x, -0.5, z])))
         
         # Combine meshes
-        bridge = trimesh.util.concatenate([platform, deck] + railings + pillars)
+        bridge = _instance([platform, deck] + railings + pillars)
         
         # Save model
-        output_path = self.output_dir / "features" / "bridge.glb"
-        bridge.export(output_path)
-        return output_path
+        output_path = self._output_path("features", "bridge")
+        return self._export(bridge, output_path)
     
     def generate_tower_model(self) -> Path:
         """Generate a tower model"""
         # Create base platform
-        platform = box(extents=[2, 0.5, 2])
+        platform = (_primitive_template('box', extents=(2, 0.5, 2)), None)
         
         # Create main tower structure
-        tower = cylinder(radius=0.8, height=4.0)
-        tower.apply_transform(translation_matrix([0, 2.25, 0]))
+        tower = (_primitive_template('cylinder', radius=0.8, height=4.0), translation_matrix([0, 2.25, 0]))
         
         # Create tower roof
-        roof = cone(radius=1.0, height=1.5)
-        roof.apply_transform(translation_matrix([0, 5.0, 0]))
+        roof = (_primitive_template('cone', radius=1.0, height=1.5), translation_matrix([0, 5.0, 0]))
         
         # Create windows
         windows = []
@@ -398,9 +518,8 @@ class ModelGenerator:
             (-0.8, 1.5, 0), (-0.8, 3.0, 0)  # West windows
         ]
         for x, y, z in window_positions:
-            window = box(extents=[0.2, 0.4, 0.1])
-            window.apply_transform(translation_matrix([x, y, z]))
-            windows.append(window)
+            window = _primitive_template('box', extents=(0.2, 0.4, 0.1))
+            windows.append((window, translation_matrix([x, y, z])))
         
         # Create battlements
         battlements = []
@@ -409,43 +528,56 @@ class ModelGenerator:
             (-0.6, 4.0, 0.6), (-0.6, 4.0, -0.6)
         ]
         for x, y, z in battlement_positions:
-            battlement = box(extents=[0.2, 0.3, 0.2])
-            battlement.apply_transform(translation_matrix([x, y, z]))
-            battlements.append(battlement)
+            battlement = _primitive_template('box', extents=(0.2, 0.3, 0.2))
+            battlements.append((battlement, translation_matrix([x, y, z])))
         
         # Combine meshes
-        tower_model = trimesh.util.concatenate([platform, tower, roof] + windows + battlements)
+        tower_model = _instance([platform, tower, roof] + windows + battlements)
         
         # Save model
-        output_path = self.output_dir / "features" / "tower.glb"
-        tower_model.export(output_path)
-        return output_path
+        output_path = self._output_path("features", "tower")
+        return self._export(tower_model, output_path)
     
     def generate_all_models(self) -> Dict[str, Dict[str, str]]:
-        """Generate all models and return their paths"""
-        models = {
-            "features": {
-                "tree": str(self.generate_tree_model()),
-                "rock": str(self.generate_rock_model()),
-                "building": str(self.generate_building_model()),
-                "temple": str(self.generate_temple_model()),
-                "ruins": str(self.generate_ruins_model()),
-                "well": str(self.generate_well_model()),
-                "camp": str(self.generate_camp_model()),
-                "dungeon": str(self.generate_dungeon_model()),
-                "bridge": str(self.generate_bridge_model()),
-                "tower": str(self.generate_tower_model())
-            },
-            "props": {
-                "bush": str(self.generate_bush_model()),
-                "flower": str(self.generate_flower_model()),
-                "stone": str(self.generate_stone_model())
+        """Generate all models in parallel and return their paths"""
+        generators = {"features": {}, "props": {}}
+        for name, (category, _) in self._MODELS.items():
+            generators[category][name] = getattr(self, f"generate_{name}_model")
+        
+        # Models are independent, so build and export them concurrently;
+        # a cacheable model whose keyed file already exists is reused as-is
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = {
+                category: {
+                    name: executor.submit(self._cached_or_generate, category, name, generate)
+                    for name, generate in group.items()
+                }
+                for category, group in generators.items()
+            }
+            models = {
+                category: {name: str(future.result()) for name, future in group.items()}
+                for category, group in futures.items()
             }
-        }
         
-        # Save model manifest
+        self.wait_for_exports()
+        for group in models.values():
+            for path in group.values():
+                self._prune_stale(Path(path))
+        
+        # Save model manifest when any entry changed
         manifest_path = self.output_dir / "models.json"
-        with open(manifest_path, 'w') as f:
-            json.dump(models, f, indent=2)
+        if not manifest_path.exists() or json.loads(manifest_path.read_text()) != models:
+            with open(manifest_path, 'w') as f:
+                json.dump(models, f, indent=2)
         
-        return models 
\ No newline at end of file
+        return models
+    
+    def _cached_or_generate(self, category: str, name: str, generate) -> Path:
+        """Return the existing model file for the current source and seed, or build it
+        
+        Random models without a seed are always rebuilt, overwriting the same path.
+        """
+        output_path = self._output_path(category, name)
+        if output_path.exists() and (self._seeded or not self._is_random(name)):
+            return output_path
+        return generate() 
\ No newline at end of file
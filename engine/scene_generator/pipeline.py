@@ -1,4 +1,3 @@
-import os
 import sys
 from pathlib import Path
 
@@ -13,13 +12,6 @@ from image_scene_synthesis.structure_extraction import extract_structure
 from image_scene_synthesis.mesh_synthesis import synthesize_mesh
 from image_scene_synthesis.wfc_tiling import wfc_tiling
 
-def run(cmd):
-    print(f"\n[PIPELINE] Running: {cmd}")
-    result = subprocess.run(cmd, shell=True)
-    if result.returncode != 0:
-        print(f"[PIPELINE] Step failed: {cmd}")
-        sys.exit(1)
-
 def main(prompt):
     Path("data/images").mkdir(parents=True, exist_ok=True)
     Path("data/labels").mkdir(parents=True, exist_ok=True)
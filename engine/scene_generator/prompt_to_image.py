@@ -1,7 +1,8 @@
 import sys
 import os
+from functools import lru_cache
 from pathlib import Path
-from diffusers import StableDiffusionPipeline
+from diffusers import StableDiffusionPipeline, DPMSolverMultistepScheduler
 import torch
 import json
 from config_loader import ConfigLoader
@@ -13,6 +14,21 @@ args = ConfigLoader.parse_args()
 config_loader.override_with_args(args)
 config = config_loader.get_config()
 
+@lru_cache(maxsize=1)
+def load_pipeline(model_id, device):
+    """Load a Stable Diffusion pipeline once per (model_id, device) and reuse it across calls."""
+    pipe = StableDiffusionPipeline.from_pretrained(
+        model_id,
+        torch_dtype=torch.float16 if device == "cuda" else torch.float32
+    )
+    pipe = pipe.to(device)
+
+    # DPM-Solver++ matches the default 50-step scheduler in about 20 steps;
+    # attention already runs through PyTorch 2's fused SDPA kernels
+    pipe.scheduler = DPMSolverMultistepScheduler.from_config(pipe.scheduler.config)
+    pipe.enable_vae_slicing()
+    return pipe
+
 def generate_image(prompt, output_dir):
     print(f"Generating image for prompt: {prompt}")
     Path(output_dir).mkdir(parents=True, exist_ok=True)
@@ -22,11 +38,10 @@ def generate_image(prompt, output_dir):
     device = config['prompt_to_image']['device']
     if device == "auto":
         device = "cuda" if torch.cuda.is_available() else "cpu"
-    pipe = StableDiffusionPipeline.from_pretrained(model_id, torch_dtype=torch.float16)
-    pipe = pipe.to(device)
+    pipe = load_pipeline(model_id, device)
 
     # Generate image
-    image = pipe(prompt).images[0]
+    image = pipe(prompt, num_inference_steps=20, guidance_scale=7.0).images[0]
     
     # Save the generated image
     image.save(f"{output_dir}/SD_input_image.png")
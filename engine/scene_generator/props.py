@@ -1,13 +1,130 @@
 from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 import numpy as np
+from numba import njit, prange
+from scipy.ndimage import distance_transform_edt
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import os
 import json
 import logging
-from .utils import generate_noise, blend_noise, calculate_distance_field
+from .utils import generate_noise, calculate_distance_field, contiguous_float32, save_json
 
 logger = logging.getLogger(__name__)
 
+@njit(parallel=True, cache=True)
+def _fit_batch_kernel(
+    elevation: np.ndarray,
+    moisture: np.ndarray,
+    sun: np.ndarray,
+    noise: np.ndarray,
+    moisture_noise: np.ndarray,
+    elev_mean: np.ndarray,
+    moist_mean: np.ndarray,
+    sun_preference: np.ndarray,
+    noise_ratio: np.ndarray,
+    out: np.ndarray
+):
+    """Write the noise-weighted environmental fit of every prop type into out[k]
+    
+    Each input cell is read once and scored against all K types.
+    """
+    for i in prange(out.shape[1]):
+        for j in range(out.shape[2]):
+            e = elevation[i, j]
+            m = moisture[i, j]
+            s = sun[i, j]
+            n = noise[i, j]
+            mn = moisture_noise[i, j]
+            for k in range(out.shape[0]):
+                fit = (
+                    max(1 - abs(e - elev_mean[k]), 0.0)
+                    + max(1 - abs(m - moist_mean[k]), 0.0)
+                    + max(1 - abs(s - sun_preference[k]), 0.0)
+                ) / 3
+                out[k, i, j] = (n * (1 - noise_ratio[k]) + mn * noise_ratio[k]) * fit
+
+@njit(inline='always', cache=True)
+def _mask_row(
+    fit: np.ndarray,
+    distance: np.ndarray,
+    min_distance: float,
+    out: np.ndarray,
+    row_min: np.ndarray,
+    row_max: np.ndarray,
+    i: int
+):
+    """Mask row i of fit into out and record its min and max"""
+    lo = 0.0
+    hi = 0.0
+    for j in range(out.shape[1]):
+        out[i, j] = fit[i, j] if distance[i, j] >= min_distance else 0.0
+        if j == 0 or out[i, j] < lo:
+            lo = out[i, j]
+        if j == 0 or out[i, j] > hi:
+            hi = out[i, j]
+    row_min[i] = lo
+    row_max[i] = hi
+
+@njit(inline='always', cache=True)
+def _threshold_row(placement: np.ndarray, lo: float, span: float, cutoff: float, i: int):
+    """Rescale row i of placement from [lo, lo + span] and zero it below cutoff"""
+    for j in range(placement.shape[1]):
+        value = placement[i, j]
+        placement[i, j] = (value - lo) / span if value >= cutoff else 0.0
+
+@njit(parallel=True, cache=True)
+def _mask_kernel(
+    fit: np.ndarray,
+    distance: np.ndarray,
+    min_distance: float,
+    out: np.ndarray,
+    row_min: np.ndarray,
+    row_max: np.ndarray
+):
+    """Copy fit into out, zeroed near occupied cells
+    
+    Also records each row's min and max so normalization needs no extra scan.
+    """
+    for i in prange(out.shape[0]):
+        _mask_row(fit, distance, min_distance, out, row_min, row_max, i)
+
+@njit(nogil=True, cache=True)
+def _mask_kernel_serial(
+    fit: np.ndarray,
+    distance: np.ndarray,
+    min_distance: float,
+    out: np.ndarray,
+    row_min: np.ndarray,
+    row_max: np.ndarray
+):
+    """Single-threaded _mask_kernel for callers already running on a worker thread
+    
+    Parallel regions must not be launched from several threads at once.
+    """
+    for i in range(out.shape[0]):
+        _mask_row(fit, distance, min_distance, out, row_min, row_max, i)
+
+@njit(parallel=True, cache=True)
+def _normalize_threshold(placement: np.ndarray, lo: float, hi: float, threshold: float):
+    """Rescale placement to 0-1 in place and zero everything below threshold
+    
+    The threshold is mapped back to raw values once, so only surviving cells
+    are rescaled.
+    """
+    span = hi - lo
+    cutoff = lo + threshold * span
+    for i in prange(placement.shape[0]):
+        _threshold_row(placement, lo, span, cutoff, i)
+
+@njit(nogil=True, cache=True)
+def _normalize_threshold_serial(placement: np.ndarray, lo: float, hi: float, threshold: float):
+    """Single-threaded _normalize_threshold for callers already running on a worker thread"""
+    span = hi - lo
+    cutoff = lo + threshold * span
+    for i in range(placement.shape[0]):
+        _threshold_row(placement, lo, span, cutoff, i)
+
 @dataclass
 class PropType:
     """Template for a prop type with placement properties"""
@@ -23,12 +140,34 @@ class PropType:
     max_density: float = 0.1
     style_tags: List[str] = None
 
+@dataclass
+class PropTypeBatch:
+    """Structure-of-arrays view of the placement fields of several prop types"""
+    names: List[str]
+    elev_mean: np.ndarray
+    moist_mean: np.ndarray
+    sun_preference: np.ndarray
+    noise_ratio: np.ndarray
+    
+    @classmethod
+    def from_types(cls, prop_types: List[PropType]) -> 'PropTypeBatch':
+        """Gather per-type scalars into (K,) float64 arrays"""
+        return cls(
+            [prop.name for prop in prop_types],
+            np.array([np.mean(prop.elevation_range) for prop in prop_types], dtype=np.float64),
+            np.array([np.mean(prop.moisture_range) for prop in prop_types], dtype=np.float64),
+            np.array([prop.sun_preference for prop in prop_types], dtype=np.float64),
+            np.array([prop.noise_ratio for prop in prop_types], dtype=np.float64)
+        )
+
 class PropPlacer:
     """Handles prop placement with environmental awareness"""
     
     def __init__(self):
         """Initialize prop placer"""
         self.prop_types: Dict[str, PropType] = {}
+        self._distance_cache: Optional[Tuple[np.ndarray, np.ndarray, float]] = None
+        self._edt_buffer: Optional[np.ndarray] = None
         self._load_default_props()
     
     def _load_default_props(self):
@@ -112,22 +251,10 @@ class PropPlacer:
         """Get prop type by name"""
         return self.prop_types.get(name)
     
-    def place_props(
-        self,
-        elevation_map: np.ndarray,
-        moisture_map: np.ndarray,
-        sun_map: np.ndarray,
-        occupied_map: np.ndarray,
-        prop_type: PropType,
-        seed: Optional[int] = None
-    ) -> Tuple[np.ndarray, List[Tuple[int, int]]]:
-        """Place props of given type based on environmental conditions"""
-        if seed is not None:
-            np.random.seed(seed)
-        
-        # Generate noise for prop placement
+    def _placement_noise(self, shape: Tuple[int, int], seed: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Perlin placement noise and simplex moisture noise, shared by every prop type"""
         noise = generate_noise(
-            elevation_map.shape,
+            shape,
             scale=20.0,
             octaves=4,
             persistence=0.5,
@@ -135,97 +262,223 @@ class PropPlacer:
             seed=seed,
             noise_type='perlin'
         )
-        
-        # Blend with moisture-based noise
-        moisture_seed = seed + 1 if seed is not None else None
         moisture_noise = generate_noise(
-            elevation_map.shape,
+            shape,
             scale=15.0,
             octaves=3,
             persistence=0.4,
             lacunarity=1.8,
-            seed=moisture_seed,
+            seed=seed + 1,
             noise_type='simplex'
         )
+        return noise, moisture_noise
+    
+    def fit_all(
+        self,
+        elevation_map: np.ndarray,
+        moisture_map: np.ndarray,
+        sun_map: np.ndarray,
+        prop_types: List[PropType],
+        seed: Optional[int] = None
+    ) -> np.ndarray:
+        """Noise-weighted environmental fit of each prop type, stacked as (K, H, W) float32"""
+        elevation_map = contiguous_float32(elevation_map)
+        moisture_map = contiguous_float32(moisture_map)
+        sun_map = contiguous_float32(sun_map)
+        if seed is None:
+            seed = int(np.random.default_rng().integers(0, 1000000))
+        noise, moisture_noise = self._placement_noise(elevation_map.shape, seed)
         
-        noise = blend_noise(noise, moisture_noise, prop_type.noise_ratio)
-        
-        # Calculate environmental fit
-        elevation_fit = np.clip(
-            1 - np.abs(elevation_map - np.mean(prop_type.elevation_range)),
-            0, 1
-        )
-        moisture_fit = np.clip(
-            1 - np.abs(moisture_map - np.mean(prop_type.moisture_range)),
-            0, 1
-        )
-        sun_fit = np.clip(
-            1 - np.abs(sun_map - prop_type.sun_preference),
-            0, 1
+        batch = PropTypeBatch.from_types(prop_types)
+        fits = np.empty((len(prop_types),) + elevation_map.shape, dtype=np.float32)
+        _fit_batch_kernel(
+            elevation_map,
+            moisture_map,
+            sun_map,
+            noise,
+            moisture_noise,
+            batch.elev_mean,
+            batch.moist_mean,
+            batch.sun_preference,
+            batch.noise_ratio,
+            fits
         )
+        return fits
+    
+    def place_props(
+        self,
+        elevation_map: np.ndarray,
+        moisture_map: np.ndarray,
+        sun_map: np.ndarray,
+        occupied_map: np.ndarray,
+        prop_type: PropType,
+        seed: Optional[int] = None,
+        fit_map: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, List[Tuple[int, int]]]:
+        """Place props of given type based on environmental conditions
+        
+        fit_map is this type's slice of fit_all; it is computed here when omitted.
+        """
+        elevation_map = contiguous_float32(elevation_map)
+        moisture_map = contiguous_float32(moisture_map)
+        sun_map = contiguous_float32(sun_map)
         
-        # Combine environmental factors
-        fit_map = (elevation_fit + moisture_fit + sun_fit) / 3
+        # Local generator, so concurrent callers never share global RNG state
+        rng = np.random.default_rng(seed)
+        if seed is None:
+            seed = int(rng.integers(0, 1000000))
         
-        # Apply noise and environmental fit
-        placement_map = noise * fit_map
+        # Blend placement and moisture noise, weighted by environmental fit
+        if fit_map is None:
+            fit_map = self.fit_all(elevation_map, moisture_map, sun_map, [prop_type], seed)[0]
+        else:
+            fit_map = contiguous_float32(fit_map)
+        
+        # Calculate distance field, exact up to the largest min_distance in use
+        cap = max(prop_type.min_distance, *(prop.min_distance for prop in self.prop_types.values()))
+        distance_field = self._distance_field(occupied_map, cap)
+        
+        return self._place_from_fit(fit_map, distance_field, prop_type, rng)
+    
+    def place_all_types(
+        self,
+        elevation_map: np.ndarray,
+        moisture_map: np.ndarray,
+        sun_map: np.ndarray,
+        occupied_map: np.ndarray,
+        seed: Optional[int] = None
+    ) -> Dict[str, Tuple[np.ndarray, List[Tuple[int, int]]]]:
+        """Place every registered prop type against the same occupancy, one thread per type
         
-        # Calculate distance field
-        distance_field = calculate_distance_field(occupied_map)
+        Types do not see each other's clusters; use place_props in sequence when they must.
+        """
+        elevation_map = contiguous_float32(elevation_map)
+        moisture_map = contiguous_float32(moisture_map)
+        sun_map = contiguous_float32(sun_map)
+        prop_types = list(self.prop_types.values())
+        if not prop_types:
+            return {}
+        if seed is None:
+            seed = int(np.random.default_rng().integers(0, 1000000))
+        
+        # Shared inputs are computed once, before any worker starts
+        fits = self.fit_all(elevation_map, moisture_map, sun_map, prop_types, seed)
+        cap = max(prop.min_distance for prop in prop_types)
+        distance_field = self._distance_field(occupied_map, cap)
+        
+        # Each type gets its own generator; workers run the serial kernels, which release the GIL
+        workers = min(len(prop_types), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                prop_type.name: pool.submit(
+                    self._place_from_fit,
+                    fit_map,
+                    distance_field,
+                    prop_type,
+                    np.random.default_rng(seed + i),
+                    True
+                )
+                for i, (prop_type, fit_map) in enumerate(zip(prop_types, fits))
+            }
+        return {name: future.result() for name, future in futures.items()}
+    
+    def _place_from_fit(
+        self,
+        fit_map: np.ndarray,
+        distance_field: np.ndarray,
+        prop_type: PropType,
+        rng: np.random.Generator,
+        serial: bool = False
+    ) -> Tuple[np.ndarray, List[Tuple[int, int]]]:
+        """Mask, threshold and sweep one fit map into cluster centers
+        
+        serial selects the single-threaded kernels, for calls from worker threads.
+        """
+        mask_kernel = _mask_kernel_serial if serial else _mask_kernel
+        normalize_threshold = _normalize_threshold_serial if serial else _normalize_threshold
         
         # Apply distance constraints
-        placement_map[distance_field < prop_type.min_distance] = 0
+        placement_map = np.empty(fit_map.shape, dtype=np.float32)
+        row_min = np.empty(placement_map.shape[0], dtype=np.float32)
+        row_max = np.empty(placement_map.shape[0], dtype=np.float32)
+        mask_kernel(
+            fit_map,
+            distance_field,
+            float(prop_type.min_distance),
+            placement_map,
+            row_min,
+            row_max
+        )
         
         # Normalize and threshold
-        placement_map = (placement_map - placement_map.min()) / (placement_map.max() - placement_map.min())
-        threshold = 1 - prop_type.max_density
-        placement_map[placement_map < threshold] = 0
+        lo, hi = float(row_min.min()), float(row_max.max())
+        if hi > lo:
+            normalize_threshold(placement_map, lo, hi, 1 - prop_type.max_density)
+        else:
+            placement_map.fill(0)
         
-        # Find cluster centers
+        # Find cluster centers: sweep candidates best-first, skipping cleared cells
+        flat = placement_map.ravel()
+        candidates = np.flatnonzero(flat > 0)
+        order = candidates[np.argsort(-flat[candidates], kind='stable')]
+        ys, xs = np.unravel_index(order, placement_map.shape)
+        
+        cleared = np.zeros(placement_map.shape, dtype=bool)
+        min_size, max_size = prop_type.cluster_size
         cluster_centers = []
-        while np.any(placement_map > 0):
-            # Find best placement
-            best_idx = np.unravel_index(
-                np.argmax(placement_map),
-                placement_map.shape
-            )
+        for y, x in zip(ys.tolist(), xs.tolist()):
+            if cleared[y, x]:
+                continue
+            cluster_centers.append((y, x))
             
-            if placement_map[best_idx] > 0:
-                cluster_centers.append(best_idx)
-                
-                # Clear area around placement
-                min_size, max_size = prop_type.cluster_size
-                size = np.random.randint(min_size, max_size + 1)
-                y, x = best_idx
-                y1, y2 = max(0, y - size), min(placement_map.shape[0], y + size + 1)
-                x1, x2 = max(0, x - size), min(placement_map.shape[1], x + size + 1)
-                placement_map[y1:y2, x1:x2] = 0
-            else:
-                break
+            # Clear area around placement
+            size = int(rng.integers(min_size, max_size + 1))
+            cleared[max(0, y - size):y + size + 1, max(0, x - size):x + size + 1] = True
+        placement_map[cleared] = 0
         
         return placement_map, cluster_centers
     
+    def _distance_field(self, occupied_map: np.ndarray, cap: float) -> np.ndarray:
+        """Distance to the nearest occupied cell, clipped at cap
+        
+        When cells were only added since the last call, the previous field is
+        lowered inside a window around the new cells instead of recomputed.
+        """
+        occupied = occupied_map.astype(bool)
+        if self._distance_cache is not None:
+            prev, field, prev_cap = self._distance_cache
+            if (
+                prev.shape == occupied.shape and prev_cap == cap
+                and prev.any() and not (prev & ~occupied).any()
+            ):
+                added = occupied & ~prev
+                if added.any():
+                    rows = np.flatnonzero(added.any(axis=1))
+                    cols = np.flatnonzero(added.any(axis=0))
+                    margin = int(np.ceil(cap))
+                    window = (
+                        slice(max(0, rows[0] - margin), rows[-1] + margin + 1),
+                        slice(max(0, cols[0] - margin), cols[-1] + margin + 1)
+                    )
+                    local = distance_transform_edt(~added[window], return_indices=False)
+                    np.minimum(field[window], local, out=field[window])
+                self._distance_cache = (occupied, field, cap)
+                return field
+        
+        # Full recompute into buffers reused from the previous call
+        if self._edt_buffer is None or self._edt_buffer.shape != occupied.shape:
+            self._edt_buffer = np.empty(occupied.shape, dtype=np.float64)
+        if self._distance_cache is not None and self._distance_cache[1].shape == occupied.shape:
+            field = self._distance_cache[1]
+        else:
+            field = np.empty(occupied.shape, dtype=np.float32)
+        np.minimum(calculate_distance_field(occupied, out=self._edt_buffer), cap, out=field)
+        self._distance_cache = (occupied, field, cap)
+        return field
+    
     def save_prop_types(self, path: Path):
         """Save prop types to file"""
-        data = {
-            name: {
-                'name': prop.name,
-                'description': prop.description,
-                'elevation_range': prop.elevation_range,
-                'moisture_range': prop.moisture_range,
-                'sun_preference': prop.sun_preference,
-                'cluster_size': prop.cluster_size,
-                'min_distance': prop.min_distance,
-                'weight': prop.weight,
-                'noise_ratio': prop.noise_ratio,
-                'max_density': prop.max_density,
-                'style_tags': prop.style_tags
-            }
-            for name, prop in self.prop_types.items()
-        }
-        
-        with open(path, 'w') as f:
-            json.dump(data, f, indent=2)
+        save_json({name: asdict(prop) for name, prop in self.prop_types.items()}, path)
     
     def load_prop_types(self, path: Path):
         """Load prop types from file"""
@@ -8,7 +8,7 @@ def export_scene(output_dir):
         "terrain_mesh": "data/meshes/terrain.obj",
         "biome_map": "data/labels/biome_map.png",
         "heightmap": "data/terrain/terrain_heightmap.npy",
-        "tilemap": "data/tiles/tilemap.json",
+        "tilemap": "data/tiles/tilemap.npy",
         "walkability": "data/polygons/walkability.csv",
         "biome_polygons": "data/polygons/biome_polygons.geojson",
         "adjacency_graph": "data/polygons/adjacency_graph.json"
@@ -1,46 +1,83 @@
 import numpy as np
+from functools import lru_cache
 from PIL import Image
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import torch
 import clip
 import json
-from config_loader import ConfigLoader
+from config_loader import load_config
 
-# Initialize configuration loader
-config_loader = ConfigLoader()
-config_loader.override_with_env()
-args = ConfigLoader.parse_args()
-config_loader.override_with_args(args)
-config = config_loader.get_config()
+# Single writer thread for the label map save that overlaps the PNG encode
+_writer = ThreadPoolExecutor(max_workers=1)
+
+@lru_cache(maxsize=1)
+def _get_clip(device):
+    """Load CLIP ViT-B/32 once per device (fp16 weights on CUDA)"""
+    model, preprocess = clip.load("ViT-B/32", device=device)
+    model.eval()
+    return model, preprocess
+
+@lru_cache(maxsize=8)
+def _get_text_features(device, labels):
+    """Encode the label prompts once per label set, L2-normalized"""
+    model, _ = _get_clip(device)
+    text_inputs = torch.cat([clip.tokenize(f"a photo of a {c}") for c in labels]).to(device)
+    with torch.no_grad():
+        text_features = model.encode_text(text_inputs)
+    return text_features / text_features.norm(dim=-1, keepdim=True)
+
+def _patch_boxes(width, height, patch_size):
+    """Row-major (left, upper, right, lower) boxes tiling the image"""
+    return [
+        (x, y, min(x + patch_size, width), min(y + patch_size, height))
+        for y in range(0, height, patch_size)
+        for x in range(0, width, patch_size)
+    ]
 
 def label_image(image_path, output_dir):
     print(f"Labeling image: {image_path}")
+    config = load_config()
     img = Image.open(image_path).convert("RGB")
     
     # Load CLIP model
     device = "cuda" if torch.cuda.is_available() else "cpu"
-    model, preprocess = clip.load("ViT-B/32", device=device)
+    model, preprocess = _get_clip(device)
 
-    # Preprocess image
-    image_input = preprocess(img).unsqueeze(0).to(device)
+    # Tile the image into patches
+    patch_size = config['semantic_labeling'].get('patch_size', 32)
+    batch_size = config['semantic_labeling'].get('batch_size', 256)
+    width, height = img.size
+    boxes = _patch_boxes(width, height, patch_size)
 
     # Define possible labels
-    labels = config['semantic_labeling']['labels']
-    text_inputs = torch.cat([clip.tokenize(f"a photo of a {c}") for c in labels]).to(device)
+    labels = tuple(config['semantic_labeling']['labels'])
+    text_features = _get_text_features(device, labels)
 
-    # Get features
+    # Label every patch, preprocessing and encoding one batch at a time
+    patch_labels = []
     with torch.no_grad():
-        image_features = model.encode_image(image_input)
-        text_features = model.encode_text(text_inputs)
+        for start in range(0, len(boxes), batch_size):
+            batch = torch.stack([preprocess(img.crop(box)) for box in boxes[start:start + batch_size]])
+            if device == "cuda":
+                batch = batch.pin_memory()
+            batch = batch.to(device, non_blocking=True)
+            image_features = model.encode_image(batch)
+            image_features = image_features / image_features.norm(dim=-1, keepdim=True)
+            patch_labels.append((image_features @ text_features.T).argmax(dim=-1))
+    grid_h = -(-height // patch_size)
+    grid_w = -(-width // patch_size)
+    grid = torch.cat(patch_labels).cpu().numpy().reshape(grid_h, grid_w)
 
-    # Calculate similarity
-    similarity = (100.0 * image_features @ text_features.T).softmax(dim=-1)
-    label_map = similarity.argmax(dim=-1).cpu().numpy().reshape(img.size[1], img.size[0])
+    # Upsample patch labels to full resolution
+    label_map = grid[np.arange(height)[:, None] // patch_size, np.arange(width)[None, :] // patch_size]
 
     # Save label map
     Path(output_dir).mkdir(parents=True, exist_ok=True)
-    np.save(f"{output_dir}/label_map_clip.npy", label_map)
+    # Write the raw label map in the background while the PNG encodes, then surface any write error
+    saved = _writer.submit(np.save, f"{output_dir}/label_map_clip.npy", label_map)
     Image.fromarray((label_map * 60).astype(np.uint8)).save(f"{output_dir}/biome_map.png")
+    saved.result()
     print(f"Saved label_map_clip.npy and biome_map.png to {output_dir}")
 
 if __name__ == "__main__":
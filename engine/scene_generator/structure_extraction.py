@@ -1,46 +1,60 @@
 import numpy as np
 from pathlib import Path
-import json
+import orjson
 from PIL import Image
+import cv2
 from skimage import measure
-from shapely.geometry import Polygon, mapping
-from config_loader import ConfigLoader
+import shapely
+from config_loader import load_config
 
-# Initialize configuration loader
-config_loader = ConfigLoader()
-config_loader.override_with_env()
-args = ConfigLoader.parse_args()
-config_loader.override_with_args(args)
-config = config_loader.get_config()
+def _find_contours(biome_map, level, use_cv2):
+    """Iso-contours of biome_map at level as (N, 2) row/col arrays
+
+    The OpenCV path traces the boundary pixels of the thresholded map, so its
+    points sit up to half a pixel from skimage's interpolated iso-line.
+    """
+    if not use_cv2:
+        return measure.find_contours(biome_map, level=level)
+    mask = (biome_map >= level).astype(np.uint8)
+    contours, _ = cv2.findContours(mask, cv2.RETR_LIST, cv2.CHAIN_APPROX_NONE)
+    return [contour[:, 0, ::-1].astype(np.float64) for contour in contours]
+
+def _polygon_geojson(contours):
+    """GeoJSON geometry strings for every contour with at least three points
+
+    All rings are built and serialized by GEOS in single vectorized calls.
+    """
+    rings = [contour for contour in contours if len(contour) > 2]
+    if not rings:
+        return []
+    indices = np.repeat(np.arange(len(rings)), [len(ring) for ring in rings])
+    polygons = shapely.polygons(shapely.linearrings(np.concatenate(rings), indices=indices))
+    return shapely.to_geojson(polygons).tolist()
 
 def extract_structure(biome_map_path, slope_map_path, output_dir):
     print(f"Extracting structure from: {biome_map_path}, {slope_map_path}")
+    config = load_config()
     biome_map = np.array(Image.open(biome_map_path))
     slope_map = np.array(Image.open(slope_map_path))
 
     # Detect contours using Marching Squares
     contour_level = config['structure_extraction']['contour_level']
-    contours = measure.find_contours(biome_map, level=contour_level)
-
-    # Convert contours to polygons
-    polygons = [Polygon(contour) for contour in contours if len(contour) > 2]
-
-    # Save polygons as GeoJSON
-    features = [
-        {
-            "type": "Feature",
-            "geometry": mapping(polygon),
-            "properties": {}
-        }
-        for polygon in polygons
-    ]
+    use_cv2 = config['structure_extraction'].get('use_cv2', True)
+    contours = _find_contours(biome_map, contour_level, use_cv2)
+
+    # Convert contours to polygon geometries
+    geometries = _polygon_geojson(contours)
+
+    # Save polygons as GeoJSON, splicing in the pre-serialized geometries
+    features = ",".join(f'{{"type":"Feature","geometry":{geometry},"properties":{{}}}}' for geometry in geometries)
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     with open(f"{output_dir}/biome_polygons.geojson", "w") as f:
-        json.dump({"type": "FeatureCollection", "features": features}, f)
+        f.write(f'{{"type":"FeatureCollection","features":[{features}]}}')
 
     # Save contour data
-    with open(f"{output_dir}/marching_squares_contours.json", "w") as f:
-        json.dump({"contours": [contour.tolist() for contour in contours]}, f)
+    # Contours are written straight from their buffers, without tolist() boxing
+    with open(f"{output_dir}/marching_squares_contours.json", "wb") as f:
+        f.write(orjson.dumps({"contours": contours}, option=orjson.OPT_SERIALIZE_NUMPY))
 
     print(f"Saved biome_polygons.geojson and marching_squares_contours.json to {output_dir}")
 
@@ -1,10 +1,11 @@
 from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 import numpy as np
+import cv2
 from pathlib import Path
 import json
 import logging
-from .utils import generate_noise, blend_noise, normalize_array
+from .utils import generate_noise, normalize_array, contiguous_float32, save_json
 
 logger = logging.getLogger(__name__)
 
@@ -118,12 +119,18 @@ class TerrainGenerator:
         terrain_type: TerrainType,
         seed: Optional[int] = None
     ) -> Tuple[np.ndarray, np.ndarray]:
-        """Generate terrain and moisture maps for given type"""
-        if seed is not None:
-            np.random.seed(seed)
+        """Generate terrain and moisture maps for given type
         
-        # Generate base elevation
-        elevation = np.zeros(shape)
+        Both maps are returned as float32; they feed texture-like layers that
+        do not need double precision.
+        """
+        # Draw an explicit noise seed rather than reseeding the global RNG
+        if seed is None:
+            seed = int(np.random.default_rng().integers(0, 1000000))
+        
+        # Generate base elevation, accumulating octaves in place
+        elevation = np.zeros(shape, dtype=np.float32)
+        noise = np.empty(shape, dtype=np.float32)
         for scale, weight, octaves, persistence, lacunarity in zip(
             terrain_type.noise_scales,
             terrain_type.noise_weights,
@@ -131,16 +138,18 @@ class TerrainGenerator:
             terrain_type.noise_persistence,
             terrain_type.noise_lacunarity
         ):
-            noise = generate_noise(
+            generate_noise(
                 shape,
                 scale=scale,
                 octaves=octaves,
                 persistence=persistence,
                 lacunarity=lacunarity,
                 seed=seed,
-                noise_type='perlin'
+                noise_type='perlin',
+                out=noise
             )
-            elevation += noise * weight
+            np.multiply(noise, weight, out=noise)
+            np.add(elevation, noise, out=elevation)
         
         # Normalize elevation
         elevation = normalize_array(elevation)
@@ -149,8 +158,8 @@ class TerrainGenerator:
         min_elev, max_elev = terrain_type.elevation_range
         elevation = min_elev + elevation * (max_elev - min_elev)
         
-        # Generate moisture map with different seed if provided
-        moisture_seed = seed + 1 if seed is not None else None
+        # Generate moisture map with a different seed
+        moisture_seed = seed + 1
         moisture = generate_noise(
             shape,
             scale=50.0,
@@ -171,7 +180,7 @@ class TerrainGenerator:
         # Apply elevation influence on moisture
         moisture = moisture * (1 - 0.5 * elevation)
         
-        return elevation, moisture
+        return elevation.astype(np.float32, copy=False), moisture.astype(np.float32, copy=False)
     
     def blend_terrain(
         self,
@@ -183,9 +192,18 @@ class TerrainGenerator:
         radius: float
     ) -> Tuple[np.ndarray, np.ndarray]:
         """Blend two terrain types with smooth transition"""
-        # Create distance field for blending
-        from scipy.ndimage import gaussian_filter
-        blend_map = gaussian_filter(blend_map, sigma=radius)
+        elevation1, moisture1, elevation2, moisture2, blend_map = map(
+            contiguous_float32, (elevation1, moisture1, elevation2, moisture2, blend_map)
+        )
+        
+        # Create distance field for blending (same kernel and reflect border as scipy's gaussian_filter)
+        ksize = 2 * int(4 * radius + 0.5) + 1
+        blend_map = cv2.GaussianBlur(
+            blend_map,
+            (ksize, ksize),
+            radius,
+            borderType=cv2.BORDER_REFLECT
+        )
         
         # Blend elevation and moisture
         elevation = elevation1 * (1 - blend_map) + elevation2 * blend_map
@@ -195,25 +213,7 @@ class TerrainGenerator:
     
     def save_terrain_types(self, path: Path):
         """Save terrain types to file"""
-        data = {
-            name: {
-                'name': terrain.name,
-                'description': terrain.description,
-                'elevation_range': terrain.elevation_range,
-                'moisture_range': terrain.moisture_range,
-                'noise_scales': terrain.noise_scales,
-                'noise_weights': terrain.noise_weights,
-                'noise_octaves': terrain.noise_octaves,
-                'noise_persistence': terrain.noise_persistence,
-                'noise_lacunarity': terrain.noise_lacunarity,
-                'blend_radius': terrain.blend_radius,
-                'style_tags': terrain.style_tags
-            }
-            for name, terrain in self.terrain_types.items()
-        }
-        
-        with open(path, 'w') as f:
-            json.dump(data, f, indent=2)
+        save_json({name: asdict(terrain) for name, terrain in self.terrain_types.items()}, path)
     
     def load_terrain_types(self, path: Path):
         """Load terrain types from file"""
@@ -0,0 +1,39 @@
+import json
+from types import SimpleNamespace
+import numpy as np
+from .layers import SceneGenerator
+from .utils import save_json
+
+def _tiled_scene_data():
+    """Minimal scene data covering every field the Tiled export reads"""
+    rng = np.random.default_rng(0)
+    return {
+        'terrain': {
+            'elevation': rng.random((8, 12)),
+            'moisture': rng.random((8, 12))
+        },
+        'features': {
+            'features': [{'type': 'temple', 'position': (3, 4), 'size': (2, 2)}]
+        },
+        'props': {
+            'props': [{'type': 'rock', 'position': (5, 1), 'cluster_size': 3}]
+        },
+        'visual': {'prompt': 'a quiet valley'}
+    }
+
+def test_tiled_export_round_trip(tmp_path):
+    """A Tiled export saved with save_json loads back as the same map"""
+    generator = SceneGenerator.__new__(SceneGenerator)
+    generator.config = SimpleNamespace(visual=SimpleNamespace(style='realistic'))
+    exported = generator._export_to_tiled(_tiled_scene_data())
+    
+    path = tmp_path / 'scene_tiled.json'
+    save_json(exported, path)
+    with open(path) as f:
+        loaded = json.load(f)
+    
+    assert loaded['tilemap'] == exported['tilemap']
+    assert loaded['tileset'] == {str(tile): info for tile, info in exported['tileset'].items()}
+    assert loaded['metadata'] == exported['metadata']
+    assert [asset['type'] for asset in loaded['assets']] == ['temple', 'rock']
+    assert loaded['assets'][0]['position'] == [3, 4]
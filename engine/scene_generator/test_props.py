@@ -0,0 +1,46 @@
+import numpy as np
+from .props import PropPlacer
+
+def _maps(shape=(48, 64), seed=0):
+    """Random elevation, moisture and sun maps in 0-1"""
+    rng = np.random.default_rng(seed)
+    return tuple(rng.random(shape, dtype=np.float32) for _ in range(3))
+
+def test_distance_field_incremental_matches_full_recompute():
+    """Adding occupied cells updates the cached field to what a fresh EDT gives"""
+    placer = PropPlacer()
+    occupied = np.zeros((40, 50), dtype=bool)
+    occupied[5, 5] = occupied[30, 40] = True
+    placer._distance_field(occupied, 6.0)
+    
+    occupied = occupied.copy()
+    occupied[20:23, 10:14] = True
+    occupied[38, 2] = True
+    incremental = placer._distance_field(occupied, 6.0).copy()
+    
+    full = PropPlacer()._distance_field(occupied, 6.0)
+    np.testing.assert_array_equal(incremental, full)
+    assert incremental.max() == 6.0
+
+def test_place_all_types_matches_sequential_placement():
+    """Threaded placement of every type equals placing each type from the same fits in turn"""
+    placer = PropPlacer()
+    elevation, moisture, sun = _maps()
+    occupied = np.zeros(elevation.shape, dtype=bool)
+    occupied[10:14, 20:30] = True
+    assert len(placer.prop_types) > 1
+    
+    placed = placer.place_all_types(elevation, moisture, sun, occupied, seed=7)
+    
+    prop_types = list(placer.prop_types.values())
+    fits = placer.fit_all(elevation, moisture, sun, prop_types, seed=7)
+    distance_field = placer._distance_field(occupied, max(prop.min_distance for prop in prop_types))
+    assert list(placed) == [prop.name for prop in prop_types]
+    for i, (prop_type, fit_map) in enumerate(zip(prop_types, fits)):
+        expected_map, expected_centers = placer._place_from_fit(
+            fit_map, distance_field, prop_type, np.random.default_rng(7 + i)
+        )
+        placement_map, centers = placed[prop_type.name]
+        np.testing.assert_array_equal(placement_map, expected_map)
+        assert centers == expected_centers
+        assert not placement_map[occupied].any()
@@ -0,0 +1,64 @@
+import base64
+import numpy as np
+import noise
+from .utils import generate_noise, pack_array
+
+def _unpack(packed):
+    """Decode a packed array the way SceneRenderer.unpackArray does"""
+    data = np.frombuffer(base64.b64decode(packed['data']), dtype=np.uint8)
+    size = int(np.prod(packed['shape']))
+    if packed['dtype'] == 'bool':
+        # np.packbits order: most significant bit first
+        i = np.arange(size)
+        flat = (data[i >> 3] >> (7 - (i & 7))) & 1
+    elif packed['dtype'] == 'float16':
+        flat = data.view('<u2').view('<f2').astype(np.float32)
+    else:
+        flat = data.view('<' + np.dtype(packed['dtype']).str[1:])
+    return flat.reshape(packed['shape'])
+
+def test_pack_array_bool_is_msb_first_bits():
+    """Boolean arrays pack eight cells per byte, first cell in the high bit"""
+    mask = np.zeros((3, 5), dtype=bool)
+    mask[0, 0] = mask[1, 2] = mask[2, 4] = True
+    packed = pack_array(mask, dtype='bool')
+    
+    assert packed['dtype'] == 'bool'
+    assert packed['shape'] == [3, 5]
+    assert base64.b64decode(packed['data'])[0] == 0b10000001
+    np.testing.assert_array_equal(_unpack(packed), mask)
+
+def test_pack_array_float16_is_little_endian_half():
+    """Half floats are stored as little-endian IEEE 754 halves"""
+    values = np.array([[0.0, 0.5, -1.25], [1.0, 65504.0, 2.0 ** -24]], dtype=np.float32)
+    packed = pack_array(values, dtype='float16')
+    
+    assert packed['dtype'] == 'float16'
+    assert packed['shape'] == [2, 3]
+    assert base64.b64decode(packed['data'])[2:4] == b'\x00\x38'
+    np.testing.assert_array_equal(_unpack(packed), values)
+
+def _reference_noise(fn, shape, scale, seed):
+    """The same map sampled point by point with the noise library"""
+    xs = np.linspace(0, shape[1] / scale, shape[1])
+    ys = np.linspace(0, shape[0] / scale, shape[0])
+    return np.array([
+        [
+            fn(x, y, octaves=4, persistence=0.5, lacunarity=2.0,
+               repeatx=shape[1], repeaty=shape[0], base=seed)
+            for x in xs
+        ]
+        for y in ys
+    ])
+
+def test_generate_noise_matches_pnoise2():
+    """Seeded Perlin maps match noise.pnoise2 tiled with the map's period"""
+    shape = (24, 40)
+    generated = generate_noise(shape, 10.0, octaves=4, seed=7, noise_type='perlin')
+    np.testing.assert_allclose(generated, _reference_noise(noise.pnoise2, shape, 10.0, 7), atol=1e-5)
+
+def test_generate_noise_matches_snoise2_at_large_base():
+    """Seeded simplex maps match noise.snoise2, including the float32 rounding of a large base"""
+    shape = (24, 40)
+    generated = generate_noise(shape, 10.0, octaves=4, seed=999999, noise_type='simplex')
+    np.testing.assert_allclose(generated, _reference_noise(noise.snoise2, shape, 10.0, 999999), atol=1e-4)
@@ -1,10 +1,13 @@
+import math
+from functools import lru_cache
 import numpy as np
-from typing import Tuple, List, Dict, Any
+from typing import Tuple, List, Dict, Any, Union
 import torch
-from noise import pnoise2, snoise2
+from numba import njit, prange
 import logging
 from pathlib import Path
 import json
+import orjson
 import yaml
 from PIL import Image
 import io
@@ -12,6 +15,258 @@ import base64
 
 logger = logging.getLogger(__name__)
 
+# Tables from the noise package (_noise.h); PERM is doubled so lookups never wrap
+_PERM = np.tile(np.array([
+    151, 160, 137, 91, 90, 15, 131, 13, 201, 95, 96, 53, 194, 233, 7, 225,
+    140, 36, 103, 30, 69, 142, 8, 99, 37, 240, 21, 10, 23, 190, 6, 148, 247,
+    120, 234, 75, 0, 26, 197, 62, 94, 252, 219, 203, 117, 35, 11, 32, 57,
+    177, 33, 88, 237, 149, 56, 87, 174, 20, 125, 136, 171, 168, 68, 175, 74,
+    165, 71, 134, 139, 48, 27, 166, 77, 146, 158, 231, 83, 111, 229, 122,
+    60, 211, 133, 230, 220, 105, 92, 41, 55, 46, 245, 40, 244, 102, 143, 54,
+    65, 25, 63, 161, 1, 216, 80, 73, 209, 76, 132, 187, 208, 89, 18, 169,
+    200, 196, 135, 130, 116, 188, 159, 86, 164, 100, 109, 198, 173, 186, 3,
+    64, 52, 217, 226, 250, 124, 123, 5, 202, 38, 147, 118, 126, 255, 82, 85,
+    212, 207, 206, 59, 227, 47, 16, 58, 17, 182, 189, 28, 42, 223, 183, 170,
+    213, 119, 248, 152, 2, 44, 154, 163, 70, 221, 153, 101, 155, 167, 43,
+    172, 9, 129, 22, 39, 253, 19, 98, 108, 110, 79, 113, 224, 232, 178, 185,
+    112, 104, 218, 246, 97, 228, 251, 34, 242, 193, 238, 210, 144, 12, 191,
+    179, 162, 241, 81, 51, 145, 235, 249, 14, 239, 107, 49, 192, 214, 31,
+    181, 199, 106, 157, 184, 84, 204, 176, 115, 121, 50, 45, 127, 4, 150,
+    254, 138, 236, 205, 93, 222, 114, 67, 29, 24, 72, 243, 141, 128, 195,
+    78, 66, 215, 61, 156, 180
+], dtype=np.uint8), 2)
+
+# x and y components of _noise.h's GRAD3, stored as two tables (z is unused in 2D)
+_GRAD_X = np.array([1, -1, 1, -1, 1, -1, 1, -1, 0, 0, 0, 0, 1, -1, 0, 0], dtype=np.float32)
+_GRAD_Y = np.array([1, 1, -1, -1, 0, 0, 0, 0, 1, -1, 1, -1, 0, 0, -1, 1], dtype=np.float32)
+
+_GRAD4 = np.array([
+    [0, 1, 1, 1], [0, 1, 1, -1], [0, 1, -1, 1], [0, 1, -1, -1],
+    [0, -1, 1, 1], [0, -1, 1, -1], [0, -1, -1, 1], [0, -1, -1, -1],
+    [1, 0, 1, 1], [1, 0, 1, -1], [1, 0, -1, 1], [1, 0, -1, -1],
+    [-1, 0, 1, 1], [-1, 0, 1, -1], [-1, 0, -1, 1], [-1, 0, -1, -1],
+    [1, 1, 0, 1], [1, 1, 0, -1], [1, -1, 0, 1], [1, -1, 0, -1],
+    [-1, 1, 0, 1], [-1, 1, 0, -1], [-1, -1, 0, 1], [-1, -1, 0, -1],
+    [1, 1, 1, 0], [1, 1, -1, 0], [1, -1, 1, 0], [1, -1, -1, 0],
+    [-1, 1, 1, 0], [-1, 1, -1, 0], [-1, -1, 1, 0], [-1, -1, -1, 0]
+], dtype=np.float64)
+
+# float32 like the C library, whose rounding of the simplex lattice position
+# shapes the output once base pushes the coordinates far from the origin
+_F4 = np.float32((math.sqrt(5.0) - 1.0) / 4.0)
+_G4 = np.float32((5.0 - math.sqrt(5.0)) / 20.0)
+
+@njit(inline='always', cache=True)
+def _fade(t: float) -> float:
+    """Quintic Perlin fade curve"""
+    return t * t * t * (t * (t * 6 - 15) + 10)
+
+@njit(inline='always', cache=True)
+def _grad2(h: int, x: float, y: float) -> float:
+    """Dot of (x, y) with the hashed 2D gradient"""
+    h &= 15
+    return x * _GRAD_X[h] + y * _GRAD_Y[h]
+
+@njit(cache=True)
+def _perlin_lattice(coords: np.ndarray, octaves: int, lacunarity: float, repeat: float, base: int):
+    """Per-octave lattice cell, wrapped next cell, offset and fade for one axis
+    
+    Matches noise.pnoise2's per-axis setup, except that base is wrapped into
+    the table instead of indexing past its end, so any seed is well-defined.
+    """
+    cell = np.empty((octaves, coords.shape[0]), dtype=np.int64)
+    next_cell = np.empty((octaves, coords.shape[0]), dtype=np.int64)
+    offset = np.empty((octaves, coords.shape[0]))
+    fade = np.empty((octaves, coords.shape[0]))
+    freq = 1.0
+    for o in range(octaves):
+        period = repeat * freq
+        for c in range(coords.shape[0]):
+            v = coords[c] * freq
+            i = int(math.floor(np.fmod(v, period)))
+            ii = int(np.fmod(i + 1, period))
+            cell[o, c] = ((i & 255) + base) & 255
+            next_cell[o, c] = ((ii & 255) + base) & 255
+            offset[o, c] = v - math.floor(v)
+            fade[o, c] = _fade(offset[o, c])
+        freq *= lacunarity
+    return cell, next_cell, offset, fade
+
+@njit(inline='always', cache=True)
+def _simplex_corner(gi: int, x: float, y: float, z: float, w: float) -> float:
+    """Contribution of one 4D simplex corner"""
+    t = 0.6 - x * x - y * y - z * z - w * w
+    if t < 0.0:
+        return 0.0
+    t *= t
+    return t * t * (_GRAD4[gi, 0] * x + _GRAD4[gi, 1] * y + _GRAD4[gi, 2] * z + _GRAD4[gi, 3] * w)
+
+@njit(cache=True)
+def _simplex4(x: float, y: float, z: float, w: float) -> float:
+    """4D float32 simplex noise, matching noise._simplex.noise4"""
+    s = (x + y + z + w) * _F4
+    i = np.floor(x + s)
+    j = np.floor(y + s)
+    k = np.floor(z + s)
+    l = np.floor(w + s)
+    t = (i + j + k + l) * _G4
+    x0 = x - (i - t)
+    y0 = y - (j - t)
+    z0 = z - (k - t)
+    w0 = w - (l - t)
+    
+    # Rank each axis instead of looking up the SIMPLEX table
+    rx = (x0 > y0) + (x0 > z0) + (x0 > w0)
+    ry = (x0 <= y0) + (y0 > z0) + (y0 > w0)
+    rz = (x0 <= z0) + (y0 <= z0) + (z0 > w0)
+    rw = (x0 <= w0) + (y0 <= w0) + (z0 <= w0)
+    i1, j1, k1, l1 = int(rx >= 3), int(ry >= 3), int(rz >= 3), int(rw >= 3)
+    i2, j2, k2, l2 = int(rx >= 2), int(ry >= 2), int(rz >= 2), int(rw >= 2)
+    i3, j3, k3, l3 = int(rx >= 1), int(ry >= 1), int(rz >= 1), int(rw >= 1)
+    
+    I = int(i) & 255
+    J = int(j) & 255
+    K = int(k) & 255
+    L = int(l) & 255
+    gi0 = _PERM[I + _PERM[J + _PERM[K + _PERM[L]]]] & 0x1f
+    gi1 = _PERM[I + i1 + _PERM[J + j1 + _PERM[K + k1 + _PERM[L + l1]]]] & 0x1f
+    gi2 = _PERM[I + i2 + _PERM[J + j2 + _PERM[K + k2 + _PERM[L + l2]]]] & 0x1f
+    gi3 = _PERM[I + i3 + _PERM[J + j3 + _PERM[K + k3 + _PERM[L + l3]]]] & 0x1f
+    gi4 = _PERM[I + 1 + _PERM[J + 1 + _PERM[K + 1 + _PERM[L + 1]]]] & 0x1f
+    
+    total = _simplex_corner(gi0, x0, y0, z0, w0)
+    total += _simplex_corner(gi1, x0 - i1 + _G4, y0 - j1 + _G4, z0 - k1 + _G4, w0 - l1 + _G4)
+    total += _simplex_corner(gi2, x0 - i2 + 2 * _G4, y0 - j2 + 2 * _G4, z0 - k2 + 2 * _G4, w0 - l2 + 2 * _G4)
+    total += _simplex_corner(gi3, x0 - i3 + 3 * _G4, y0 - j3 + 3 * _G4, z0 - k3 + 3 * _G4, w0 - l3 + 3 * _G4)
+    total += _simplex_corner(gi4, x0 - 1 + 4 * _G4, y0 - 1 + 4 * _G4, z0 - 1 + 4 * _G4, w0 - 1 + 4 * _G4)
+    return 27.0 * total
+
+@njit(inline='always', cache=True)
+def _fast_sin(x: float) -> float:
+    """noise's parabolic sine approximation; x is in half-turns"""
+    x -= 2.0 * np.rint(0.5 * x)
+    y = x - x * abs(x)
+    return y * (3.1 + 3.6 * abs(y))
+
+@njit(parallel=True, cache=True)
+def _perlin_grid(
+    xs: np.ndarray,
+    ys: np.ndarray,
+    octaves: int,
+    persistence: float,
+    lacunarity: float,
+    repeatx: float,
+    repeaty: float,
+    base: int,
+    out: np.ndarray
+):
+    """Write fractal Perlin noise over the xs by ys grid, as noise.pnoise2 would
+    
+    Lattice setup is done once per row and column, so the per-cell work is
+    only table hashing and interpolation.
+    """
+    xi, xn, xo, xfade = _perlin_lattice(xs, octaves, lacunarity, repeatx, base)
+    yi, yn, yo, yfade = _perlin_lattice(ys, octaves, lacunarity, repeaty, base)
+    for r in prange(ys.shape[0]):
+        for c in range(xs.shape[0]):
+            amp = 1.0
+            total = 0.0
+            max_amp = 0.0
+            for o in range(octaves):
+                x = xo[o, c]
+                y = yo[o, r]
+                j = yi[o, r]
+                jj = yn[o, r]
+                a = _PERM[xi[o, c]]
+                b = _PERM[xn[o, c]]
+                n00 = _grad2(_PERM[_PERM[a + j]], x, y)
+                n10 = _grad2(_PERM[_PERM[b + j]], x - 1, y)
+                n01 = _grad2(_PERM[_PERM[a + jj]], x, y - 1)
+                n11 = _grad2(_PERM[_PERM[b + jj]], x - 1, y - 1)
+                nx0 = n00 + xfade[o, c] * (n10 - n00)
+                nx1 = n01 + xfade[o, c] * (n11 - n01)
+                total += (nx0 + yfade[o, r] * (nx1 - nx0)) * amp
+                max_amp += amp
+                amp *= persistence
+            out[r, c] = total / max_amp
+
+@njit(parallel=True, cache=True)
+def _simplex_grid(
+    xs: np.ndarray,
+    ys: np.ndarray,
+    octaves: int,
+    persistence: float,
+    lacunarity: float,
+    repeatx: float,
+    repeaty: float,
+    base: int,
+    out: np.ndarray
+):
+    """Write tiled fractal simplex noise over the xs by ys grid, as noise.snoise2 would
+    
+    Tiling wraps each axis onto a circle and samples 4D noise on the torus.
+    The torus coordinates are rounded to float32 as the C library stores them,
+    which is what places a large base on its lattice.
+    """
+    xr = np.float32(repeatx / (2 * math.pi))
+    yr = np.float32(repeaty / (2 * math.pi))
+    for r in prange(ys.shape[0]):
+        yf = np.float32(np.float32(ys[r]) * 2.0 / repeaty)
+        y = np.float32(_fast_sin(yf)) * yr
+        w = np.float32(base) + np.float32(_fast_sin(yf + np.float32(0.5))) * yr
+        for c in range(xs.shape[0]):
+            xf = np.float32(np.float32(xs[c]) * 2.0 / repeatx)
+            x = np.float32(_fast_sin(xf)) * xr
+            z = np.float32(base) + np.float32(_fast_sin(xf + np.float32(0.5))) * xr
+            freq = np.float32(1.0)
+            amp = 1.0
+            max_amp = 1.0
+            total = _simplex4(x, y, z, w)
+            for _ in range(1, octaves):
+                freq *= np.float32(lacunarity)
+                amp *= persistence
+                max_amp += amp
+                total += _simplex4(x * freq, y * freq, z * freq, w * freq) * amp
+            out[r, c] = total / max_amp
+
+def _synthesize_noise(
+    shape: Tuple[int, int],
+    scale: float,
+    octaves: int,
+    persistence: float,
+    lacunarity: float,
+    base: int,
+    noise_type: str,
+    out: np.ndarray = None
+) -> np.ndarray:
+    """Fill a noise map with the Perlin or simplex kernel, into out when given"""
+    kernel = _perlin_grid if noise_type == 'perlin' else _simplex_grid
+    
+    # Create coordinate axes
+    x = np.linspace(0, shape[1]/scale, shape[1])
+    y = np.linspace(0, shape[0]/scale, shape[0])
+    
+    # One base for the whole map, tiled with the map's own period
+    noise = np.empty(shape, dtype=np.float32) if out is None else out
+    kernel(x, y, octaves, persistence, lacunarity, float(shape[1]), float(shape[0]), int(base), noise)
+    
+    return noise
+
+@lru_cache(maxsize=16)
+def _cached_noise(
+    shape: Tuple[int, int],
+    scale: float,
+    octaves: int,
+    persistence: float,
+    lacunarity: float,
+    base: int,
+    noise_type: str
+) -> np.ndarray:
+    """Read-only noise map shared by every caller with the same parameters"""
+    noise = _synthesize_noise(shape, scale, octaves, persistence, lacunarity, base, noise_type)
+    noise.flags.writeable = False
+    return noise
+
 def generate_noise(
     shape: Tuple[int, int],
     scale: float,
@@ -19,28 +274,24 @@ def generate_noise(
     persistence: float = 0.5,
     lacunarity: float = 2.0,
     seed: int = None,
-    noise_type: str = 'perlin'
+    noise_type: str = 'perlin',
+    out: np.ndarray = None
 ) -> np.ndarray:
-    """Generate noise map with specified parameters"""
-    noise_func = pnoise2 if noise_type == 'perlin' else snoise2
+    """Generate noise map with specified parameters
     
-    # Create coordinate grids
-    x = np.linspace(0, shape[1]/scale, shape[1])
-    y = np.linspace(0, shape[0]/scale, shape[0])
-    X, Y = np.meshgrid(x, y)
-    
-    # Vectorized noise generation
-    noise = np.vectorize(lambda x, y: noise_func(
-        x, y,
-        octaves=octaves,
-        persistence=persistence,
-        lacunarity=lacunarity,
-        repeatx=shape[1],
-        repeaty=shape[0],
-        base=seed if seed is not None else np.random.randint(0, 1000000)
-    ))(X, Y)
+    Seeded maps are cached and returned read-only; unseeded maps are fresh.
+    With out (C-contiguous float32, shape) the map is written there instead
+    and out is returned.
+    """
+    if seed is None:
+        base = np.random.randint(0, 1000000)
+        return _synthesize_noise(shape, scale, octaves, persistence, lacunarity, base, noise_type, out)
     
-    return noise
+    noise = _cached_noise(tuple(shape), scale, octaves, persistence, lacunarity, int(seed), noise_type)
+    if out is None:
+        return noise
+    np.copyto(out, noise)
+    return out
 
 def blend_noise(
     noise1: np.ndarray,
@@ -50,22 +301,57 @@ def blend_noise(
     """Blend two noise maps with specified factor"""
     return noise1 * (1 - blend_factor) + noise2 * blend_factor
 
+def contiguous_float32(arr: np.ndarray) -> np.ndarray:
+    """C-contiguous float32 view of arr, copying only when layout or dtype differ"""
+    return np.ascontiguousarray(arr, dtype=np.float32)
+
 def normalize_array(arr: np.ndarray) -> np.ndarray:
     """Normalize array to 0-1 range"""
     return (arr - arr.min()) / (arr.max() - arr.min())
 
 def calculate_distance_field(
     occupied: np.ndarray,
-    metric: str = 'euclidean'
+    metric: str = 'euclidean',
+    out: np.ndarray = None
 ) -> np.ndarray:
-    """Calculate distance field from occupied spaces"""
+    """Calculate distance field from occupied spaces
+    
+    With out (float64, occupied's shape) the field is written there and out
+    is returned; otherwise a new float32 array is returned.
+    """
     from scipy.ndimage import distance_transform_edt
     
     if metric == 'euclidean':
-        return distance_transform_edt(1 - occupied)
+        free = ~np.ascontiguousarray(occupied, dtype=bool)
+        if out is not None:
+            distance_transform_edt(free, return_indices=False, distances=out)
+            return out
+        return distance_transform_edt(free, return_indices=False).astype(np.float32)
     else:
         raise ValueError(f"Unsupported metric: {metric}")
 
+@lru_cache(maxsize=32)
+def _disk_struct(radius: float) -> np.ndarray:
+    """Read-only structuring element of offsets strictly closer than radius"""
+    r = max(int(math.ceil(radius)) - 1, 0)
+    dy, dx = np.mgrid[-r:r + 1, -r:r + 1]
+    structure = dy * dy + dx * dx < radius * radius
+    structure.flags.writeable = False
+    return structure
+
+def calculate_min_distance_mask(occupied: np.ndarray, min_distance: float) -> np.ndarray:
+    """Cells closer than min_distance to an occupied cell
+    
+    Equals calculate_distance_field(occupied) < min_distance whenever anything is
+    occupied, at the cost of one dilation rather than a full EDT.
+    """
+    from scipy.ndimage import binary_dilation
+    
+    occupied = np.ascontiguousarray(occupied, dtype=bool)
+    if min_distance <= 0:
+        return np.zeros_like(occupied)
+    return binary_dilation(occupied, structure=_disk_struct(float(min_distance)))
+
 def get_environmental_fit(
     elevation: float,
     moisture: float,
@@ -96,6 +382,19 @@ def texture_to_data_uri(texture: Image.Image) -> str:
     """Convert PIL Image to data URI"""
     return f"data:image/png;base64,{texture_to_base64(texture)}"
 
+def pack_array(arr: np.ndarray, dtype: str = 'float32') -> Dict[str, Any]:
+    """Pack array as base64-encoded little-endian bytes with its dtype and shape
+    
+    Boolean arrays are bit-packed (most significant bit first) with np.packbits.
+    """
+    arr = np.ascontiguousarray(arr, dtype=np.dtype(dtype).newbyteorder('<'))
+    data = np.packbits(arr) if arr.dtype == np.bool_ else arr
+    return {
+        'dtype': arr.dtype.name,
+        'shape': list(arr.shape),
+        'data': base64.b64encode(data.tobytes()).decode('ascii')
+    }
+
 def load_config(path: Path) -> Dict:
     """Load configuration from file"""
     with open(path, 'r') as f:
@@ -162,6 +461,20 @@ def log_gpu_memory_usage():
     for device, memory in get_gpu_memory_usage().items():
         logger.info(f"{device} memory usage: {memory:.2f} MB") 
 
+def save_json(data: Any, path: Union[str, Path]):
+    """Save data as indented JSON, serializing NumPy arrays and scalars natively
+    
+    Non-string dict keys, such as the Tiled tileset's tile ids, are written as
+    strings, as json.dump does.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(
+            data,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ))
+
 def to_json_serializable(data: Any, depth: int = 0, max_depth: int = 10, seen: set = None) -> Any:
     """Convert data to JSON serializable format
     
@@ -174,6 +487,16 @@ def to_json_serializable(data: Any, depth: int = 0, max_depth: int = 10, seen: s
     Returns:
         JSON serializable version of the data
     """
+    # Leaves need no recursion or cycle bookkeeping
+    if isinstance(data, (str, bool, type(None))):
+        return data
+    if isinstance(data, np.ndarray):
+        return data.tolist()
+    if isinstance(data, np.generic):
+        return data.item()
+    if isinstance(data, (int, float)):
+        return data
+    
     if seen is None:
         seen = set()
     
@@ -189,14 +512,10 @@ def to_json_serializable(data: Any, depth: int = 0, max_depth: int = 10, seen: s
     seen.add(id(data))
     
     try:
-        if isinstance(data, np.ndarray):
-            return data.tolist()
-        elif isinstance(data, dict):
+        if isinstance(data, dict):
             return {k: to_json_serializable(v, depth + 1, max_depth, seen) for k, v in data.items()}
         elif isinstance(data, (list, tuple)):
             return [to_json_serializable(item, depth + 1, max_depth, seen) for item in data]
-        elif isinstance(data, (int, float, str, bool, type(None))):
-            return data
         elif hasattr(data, '__dict__'):
             return to_json_serializable(data.__dict__, depth + 1, max_depth, seen)
         else:
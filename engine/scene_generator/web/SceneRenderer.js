@@ -166,8 +166,8 @@ export class SceneRenderer {
         
         // Apply height map with proper 2.5D scaling
         const vertices = geometry.attributes.position.array;
-        const heightMap = terrainData.height_map;
-        const maxHeight = Math.max(...heightMap.flat()) * terrainData.height_scale;
+        const heightMap = this.unpackArray(terrainData.height_map);
+        const maxHeight = Math.max(...heightMap.map(row => Math.max(...row))) * terrainData.height_scale;
         
         for (let i = 0; i < vertices.length; i += 3) {
             const x = Math.floor((vertices[i] + terrainData.size.width / 2) / terrainData.size.width * heightMap[0].length);
@@ -227,6 +227,46 @@ export class SceneRenderer {
         }
     }
     
+    unpackArray(packed) {
+        // Older exports store plain nested lists
+        if (Array.isArray(packed)) return packed;
+        
+        // Packed arrays are {dtype, shape, data} with base64 little-endian bytes
+        const decoders = {
+            float32: bytes => new Float32Array(bytes.buffer),
+            float16: bytes => Float32Array.from(new Uint16Array(bytes.buffer), this.halfToFloat),
+            uint8: bytes => bytes,
+            // np.packbits order: most significant bit first
+            bool: bytes => {
+                const size = packed.shape.reduce((a, b) => a * b, 1);
+                return Uint8Array.from({ length: size }, (_, i) => (bytes[i >> 3] >> (7 - (i & 7))) & 1);
+            }
+        };
+        const decode = decoders[packed.dtype];
+        if (!decode) {
+            throw new Error(`Unsupported packed array dtype: ${packed.dtype}`);
+        }
+        const flat = decode(Uint8Array.from(atob(packed.data), c => c.charCodeAt(0)));
+        
+        // Nest row views so callers can index as array[y][x]
+        const nest = (shape, offset) => {
+            if (shape.length === 1) return flat.subarray(offset, offset + shape[0]);
+            const stride = shape.slice(1).reduce((a, b) => a * b, 1);
+            return Array.from({ length: shape[0] }, (_, i) => nest(shape.slice(1), offset + i * stride));
+        };
+        return nest(packed.shape, 0);
+    }
+    
+    halfToFloat(bits) {
+        // Decode an IEEE 754 half-precision value
+        const sign = bits & 0x8000 ? -1 : 1;
+        const exponent = (bits >> 10) & 0x1f;
+        const fraction = bits & 0x3ff;
+        if (exponent === 0) return sign * Math.pow(2, -14) * (fraction / 1024);
+        if (exponent === 0x1f) return fraction ? NaN : sign * Infinity;
+        return sign * Math.pow(2, exponent - 15) * (1 + fraction / 1024);
+    }
+    
     getDefaultColor(textureName) {
         const colors = {
             water: 0x0077be,
@@ -438,13 +478,14 @@ export class SceneRenderer {
     
     setupNavigation(navData) {
         if (!navData.nav_mesh) return;
+        const walkable = this.unpackArray(navData.nav_mesh);
         
         // Create navigation mesh visualization
         const geometry = new THREE.PlaneGeometry(
-            navData.nav_mesh[0].length,
-            navData.nav_mesh.length,
-            navData.nav_mesh[0].length - 1,
-            navData.nav_mesh.length - 1
+            walkable[0].length,
+            walkable.length,
+            walkable[0].length - 1,
+            walkable.length - 1
         );
         
         const material = new THREE.MeshBasicMaterial({
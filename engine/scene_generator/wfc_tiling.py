@@ -14,7 +14,8 @@ config = config_loader.get_config()
 
 def wfc_tiling(biome_map_path, output_dir):
     print(f"Running WFC tiling on: {biome_map_path}")
-    biome_map = np.array(Image.open(biome_map_path))
+    # WFC only reads the map, so take a read-only view of the decoded pixels instead of a copy
+    biome_map = np.asarray(Image.open(biome_map_path))
 
     # Define WFC parameters
     pattern_size = config['wfc_tiling']['pattern_size']
@@ -27,13 +28,12 @@ def wfc_tiling(biome_map_path, output_dir):
     # Define tile legend
     legend = {0: "forest", 1: "river", 2: "cliff", 3: "valley"}
 
-    # Save tilemap and legend
+    # Save tilemap as a binary array and the small legend as JSON
     Path(output_dir).mkdir(parents=True, exist_ok=True)
-    with open(f"{output_dir}/tilemap.json", "w") as f:
-        json.dump({"tilemap": tilemap.tolist()}, f)
+    np.save(f"{output_dir}/tilemap.npy", tilemap)
     with open(f"{output_dir}/tile_legend.json", "w") as f:
         json.dump({"legend": legend}, f)
-    print(f"Saved tilemap.json and tile_legend.json to {output_dir}")
+    print(f"Saved tilemap.npy and tile_legend.json to {output_dir}")
 
 if __name__ == "__main__":
     import sys